@@ -31,13 +31,12 @@ Hooks for hardware
 import sys
 
 breakpoint = -1
-single_step = 0
 error = -1
 periods = 0
 column = 1
 columns = 80
-memory = [0] * 2**16
-port = [0] * 256
+memory = bytearray(2**16)
+port = bytearray(256)
 invalid = False
 regs = {"A":0, "B":0, "C":0, "D":0, "E":0, "H":0, "L":0, "PC":0, "SP":0, "RIM":0, "SIM":0}
 flags = {"S":0, "Z":0, "K":0, "AC":0, "P":0, "V":0, "CY":0}
@@ -47,574 +46,498 @@ fname = ''
 fload = False
 fsize = 0
 fline = 0
+fcname = ''       # file whose lines are cached in fclines
+fclines = []
+
+def make_DAA_table(): # Precompute DAA result for every (AC, CY, A) input
+    table = []
+    for idx in range(1024):
+        ac = idx >> 9
+        cy = (idx >> 8) & 1
+        a = idx & 255
+        ln = a & 15
+        if ln > 9 or ac == 1:
+            a += 6
+        if ln > 9:
+            ac = 1
+        hn = a // 16
+        if hn > 9 or cy == 1:
+            a = (a + 96) & 255
+        if hn > 9:
+            cy = 1
+        table.append((a, cy, ac))
+    return tuple(table)
+
+DAA_TABLE = make_DAA_table()
+
+def make_ZSP_table(): # Precompute zero, sign, parity flags for every byte
+    table = []
+    for n in range(256):
+        if n == 0:
+            zero = 1
+        else:
+            zero = 0
+        if n > 127:
+            sign = 1
+        else:
+            sign = 0
+        parity = 1
+        m = n
+        while m:
+            parity *= -1
+            m = m & (m - 1)
+        if parity == -1: parity = 0
+        table.append((zero, sign, parity))
+    return tuple(table)
+
+ZSP_TABLE = make_ZSP_table()
 
 def set_flags_ZSP( n ): # Set zero, sign, parity flags
-    global flags
-    if n == 0:
-        flags['Z'] = 1
-    else:
-        flags['Z'] = 0
-    if n > 127:
-        flags['S'] = 1
+    flags['Z'], flags['S'], flags['P'] = ZSP_TABLE[n]
+
+# Precomputed rotate results: value (or (CY<<8)|value for the rotates
+# through carry) -> (new A, new CY).
+ROT_RLC = tuple(((i << 1 | i >> 7) & 255, i >> 7) for i in range(256))
+ROT_RRC = tuple((i >> 1 | (i & 1) << 7, i & 1) for i in range(256))
+ROT_RAL = tuple((((i & 255) << 1 | i >> 8) & 255, i >> 7 & 1) for i in range(512))
+ROT_RAR = tuple(((i & 255) >> 1 | (i >> 8) << 7, i & 1) for i in range(512))
+
+def push16(value): # Push a word on the guest stack (CALL family)
+    sp = (regs['SP'] - 1) & 65535
+    memory[sp] = value >> 8
+    sp = (sp - 1) & 65535
+    memory[sp] = value & 255
+    regs['SP'] = sp
+
+def pop16(): # Pop a word off the guest stack (RET family)
+    sp = regs['SP']
+    value = memory[sp]
+    sp = (sp + 1) & 65535
+    value += memory[sp] << 8
+    regs['SP'] = (sp + 1) & 65535
+    return value
+
+def pack_psw(s, z, k, ac, p, v, cy): # Assemble the 8085-layout PSW byte
+    return (s << 7) | (z << 6) | (k << 5) | (ac << 4) | (p << 2) | (v << 1) | cy
+
+# PSW byte -> (S, Z, K, AC, P, V, CY), precomputed for POP PSW
+PSW_BITS = tuple(((i >> 7) & 1, (i >> 6) & 1, (i >> 5) & 1, (i >> 4) & 1,
+                  (i >> 2) & 1, (i >> 1) & 1, i & 1) for i in range(256))
+
+def hook_uart_out(value): # Hardware hook: port 2 mapped to UART data
+    global column
+    if value == 10: #ignore LF
+        pass
+    elif value == 13: #handle CR
+        print('\n', end='')
+        column = 1
     else:
-        flags['S'] = 0
-    parity = 1
-    while n:
-        parity *= -1
-        n = n & (n - 1)
-    if parity == -1: parity = 0
-    flags['P'] = parity
+        print(chr(value), end = '')
+        column += 1
+        if column > columns:
+            print('\n', end='')
+            column = 1
+
+def hook_uart_status(): # Hardware hook: port 3 mapped to UART status (1)
+    return 1
+
+def hook_lin(): # CALL 0057H hook: keyboard line into the monitor buffer
+    line = input()
+    KBDBFR = 0xFD00
+    buf = line.encode('latin-1') + b'\r'
+    memory[KBDBFR:KBDBFR+len(buf)] = buf
+
+def hook_flout(ptr): # CALL 0023H hook: flash-drive LOAD simulation
+    global fline, fname, fsize, fload, fcname, fclines
+    end = memory.index(0, ptr) # Find the NUL ending the DE message
+    msg = memory[ptr:end].decode('latin-1')
+    if msg == '$SIZE ': # Begin LOAD?
+        fload = True
+    elif fload == True:
+        fname = msg
+        fload = False
+    elif msg[:-1] == ' LINE': # Get number of lines in file
+        try:
+            fp = open(fname, 'r')
+            fclines = fp.readlines()
+            fp.close()
+            fcname = fname
+            fsize = len(fclines)
+            fsize += 1  # Flash drive overstates the size by 1
+            fline = 0
+        except:
+            fsize = 0
+        size = str(fsize)
+        ptr = 0xfd00  # FDBFR
+        for char in size:
+            memory[ptr] = ord(char)
+            ptr += 1
+        memory[ptr] = 0
+    elif msg == '$READ ':  # Read next line of file?
+        try:
+            if fname != fcname: # not cached by the LINE query?
+                f = open(fname)
+                fclines = f.readlines() # Read the text file
+                f.close()
+                fcname = fname
+            line = fclines[fline]
+            fline += 1
+            ptr = 0xfd03   # FDBFR memory address + 3
+            for char in line:
+                if ord(char) == 0xA:  # line feed?
+                    if memory[ptr-1] != 0xD:
+                        memory[ptr] = 0xD    # if no CR, add it
+                        ptr += 1
+                memory[ptr] = ord(char)
+                ptr +=1
+            memory[0xfc3e] = ptr & 255
+            memory[0xfc3f] = ptr >> 8
+        except:
+            print('File READ error')
+            # sys.exit()
+
+# Hooked IO ports, keyed by port number.  OUT/IN consult these after
+# the port array so new hooks need no handler edits.
+OUT_HOOKS = {2: hook_uart_out}
+IN_HOOKS = {3: hook_uart_status}
 
 def instruction_00(): # NOP
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'NOP')
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
     periods += 4
 
 def instruction_01(): # LXI B,D16
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'LXI B,' + str.format('{:02X}', memory[regs['PC']+2]) \
-        + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['C'] = memory[regs['PC']+1]
     regs['B'] = memory[regs['PC']+2]
-    regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 10
 
 def instruction_02(): # STAX B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'STAX B')
-    memory[256*regs['B'] + regs['C']] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    memory[(regs['B'] << 8) | regs['C']] = regs['A']
     periods += 7
 
 def instruction_03(): # INX B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INX B')
-    bc = (256*regs['B'] + regs['C'] + 1)
+    global periods
+    bc = ((regs['B'] << 8 | regs['C']) + 1)
     if bc > 65535:
         bc = 0
         flags['K'] = 1
     else:
         flags['K'] = 0
-    regs['B'] = bc // 256
-    regs['C'] = bc % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['B'] = bc >> 8
+    regs['C'] = bc & 255
     periods += 5
 
 def instruction_04(): # INR B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INR B')
-    i = regs['B'] + 1
-    if i > 255:
-        i = 0
+    global periods
+    i = (regs['B'] + 1) & 255
     regs['B'] = i
     set_flags_ZSP(i)
-    if i & 15 == 0:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 0)
     periods += 5
 
 def instruction_05(): # DCR B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCR B')
-    i = regs['B'] - 1
-    if i < 0:
-        i = 255
+    global periods
+    i = (regs['B'] - 1) & 255
     regs['B'] = i
     set_flags_ZSP(i)
-    if i & 15 == 15:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 15)
     periods += 5
 
 def instruction_06(): # MVI B,D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'MVI B,' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['B'] = memory[regs['PC']+1]
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 7
 
 def instruction_07(): # RLC
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'RLC')
-    i = regs['A'] << 1
-    regs['A'] = (i & 255) + (i // 256)
-    flags['CY'] = i // 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    regs['A'], flags['CY'] = ROT_RLC[regs['A']]
     periods += 4
 
-def instruction_08(): # undefined
-    print ('Undefined instuction 08 encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_09(): # DAD B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DAD B')
-    hl = 256*regs['H'] + regs['L']
-    bc = 256*regs['B'] + regs['C']
+    global periods
+    hl = (regs['H'] << 8) | regs['L']
+    bc = (regs['B'] << 8) | regs['C']
     i = hl + bc
-    flags['CY'] = i // 65536
+    flags['CY'] = i >> 16
     i = i & 65535
-    regs['H'] = i // 256
-    regs['L'] = i % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['H'] = i >> 8
+    regs['L'] = i & 255
     periods += 10
 
 def instruction_0A(): # LDAX B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'LDAX B')
-    regs['A'] = memory[256*regs['B'] + regs['C']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    regs['A'] = memory[(regs['B'] << 8) | regs['C']]
     periods += 7
 
 def instruction_0B(): # DCX B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCX B')
-    bc = (256*regs['B'] + regs['C'] - 1)
+    global periods
+    bc = ((regs['B'] << 8 | regs['C']) - 1)
     if bc < 0:
         bc = 65535
         flags['K'] = 1
     else:
         flags['K'] = 0
-    regs['B'] = bc // 256
-    regs['C'] = bc % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['B'] = bc >> 8
+    regs['C'] = bc & 255
     periods += 5
 
 def instruction_0C(): # INR C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INR C')
-    i = regs['C'] + 1
-    if i > 255:
-        i = 0
+    global periods
+    i = (regs['C'] + 1) & 255
     regs['C'] = i
     set_flags_ZSP(i)
-    if i & 15 == 0:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 0)
     periods += 5
 
 def instruction_0D(): # DCR C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCR C')
-    i = (regs['C'] - 1)
-    if i < 0:
-        i = 255
+    global periods
+    i = (regs['C'] - 1) & 255
     regs['C'] = i
     set_flags_ZSP(i)
-    if i & 15 == 15:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 15)
     periods += 5
 
 def instruction_0E(): # MVI C,D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'MVI C,' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['C'] = memory[regs['PC']+1]
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 7
 
 def instruction_0F(): # RRC
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'RRC')
-    flags['CY'] = regs['A'] & 1
-    regs['A'] = (regs['A'] >> 1) + (128 * flags['CY'])
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    regs['A'], flags['CY'] = ROT_RRC[regs['A']]
     periods += 4
 
 def instruction_10(): # ARHL (undocumented)
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ARHL')
+    global periods
     flags['CY'] = regs['L'] & 1
     regs['L'] = (regs['L'] >> 1) + 128*(regs['H'] & 1)
     regs['H'] = (regs['H'] >> 1) + (regs['H'] & 128)
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 7
 
 def instruction_11(): # LXI D,D16
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'LXI D,' + str.format('{:02X}', memory[regs['PC']+2]) \
-        + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['E'] = memory[regs['PC']+1]
     regs['D'] = memory[regs['PC']+2]
-    regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 10
 
 def instruction_12(): # STAX D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'STAX D')
-    memory[256*regs['D'] + regs['E']] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    memory[(regs['D'] << 8) | regs['E']] = regs['A']
     periods += 7
 
 def instruction_13(): # INX D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INX D')
-    de = (256*regs['D'] + regs['E'] + 1)
+    global periods
+    de = ((regs['D'] << 8 | regs['E']) + 1)
     if de > 65535:
         de = 0
         flags['K'] = 1
     else:
         flags['K'] = 0
-    regs['D'] = de // 256
-    regs['E'] = de % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['D'] = de >> 8
+    regs['E'] = de & 255
     periods += 5
 
 def instruction_14(): # INR D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INR D')
-    i = regs['D'] + 1
-    if i > 255:
-        i = 0
+    global periods
+    i = (regs['D'] + 1) & 255
     regs['D'] = i
     set_flags_ZSP(i)
-    if i & 15 == 0:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 0)
     periods += 5
 
 def instruction_15(): # DCR D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCR D')
-    i = (regs['D'] - 1)
-    if i < 0:
-        i = 255
+    global periods
+    i = (regs['D'] - 1) & 255
     regs['D'] = i
     set_flags_ZSP(i)
-    if i & 15 == 15:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 15)
     periods += 5
 
 def instruction_16(): # MVI D,D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'MVI D,' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['D'] = memory[regs['PC']+1]
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 7
 
 def instruction_17(): # RAL
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'RAL')
-    i = regs['A'] << 1
-    regs['A'] = (i & 255) + flags['CY']
-    flags['CY'] = i//256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    regs['A'], flags['CY'] = ROT_RAL[(flags['CY'] << 8) | regs['A']]
     periods += 4
 
-def instruction_18(): # undefined
-    print ('Undefined instuction 18 encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_19(): # DAD D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DAD D')
-    hl = 256*regs['H'] + regs['L']
-    de = 256*regs['D'] + regs['E']
+    global periods
+    hl = (regs['H'] << 8) | regs['L']
+    de = (regs['D'] << 8) | regs['E']
     i = hl + de
-    flags['CY'] = i // 65536
+    flags['CY'] = i >> 16
     i = i & 65535
-    regs['H'] = i // 256
-    regs['L'] = i % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['H'] = i >> 8
+    regs['L'] = i & 255
     periods += 10
 
 def instruction_1A(): # LDAX D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'LDAX D')
-    regs['A'] = memory[256*regs['D'] + regs['E']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    regs['A'] = memory[(regs['D'] << 8) | regs['E']]
     periods += 7
 
 def instruction_1B(): # DCX D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCX D')
-    de = (256*regs['D'] + regs['E'] - 1)
+    global periods
+    de = ((regs['D'] << 8 | regs['E']) - 1)
     if de < 0:
         de = 65535
         flags['K'] = 1
     else:
         flags['K'] = 0
-    regs['D'] = de // 256
-    regs['E'] = de % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['D'] = de >> 8
+    regs['E'] = de & 255
     periods += 5
 
 def instruction_1C(): # INR E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INR E')
-    i = regs['E'] + 1
-    if i > 255:
-        i = 0
+    global periods
+    i = (regs['E'] + 1) & 255
     regs['E'] = i
     set_flags_ZSP(i)
-    if i & 15 == 0:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 0)
     periods += 5
 
 def instruction_1D(): # DCR E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCR E')
-    i = (regs['E'] - 1)
-    if i < 0:
-        i = 255
+    global periods
+    i = (regs['E'] - 1) & 255
     regs['E'] = i
     set_flags_ZSP(i)
-    if i & 15 == 15:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 15)
     periods += 5
 
 def instruction_1E(): # MVI E,D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'MVI E,' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['E'] = memory[regs['PC']+1]
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 7
 
 def instruction_1F(): # RAR
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'RAR')
-    i = flags['CY']
-    flags['CY'] = regs['A'] % 2
-    regs['A'] = (regs['A'] >> 1) + (i * 128)
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    regs['A'], flags['CY'] = ROT_RAR[(flags['CY'] << 8) | regs['A']]
     periods += 4
 
-def instruction_20(): # undefined
-    print ('Undefined instuction 20 encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_21(): # LXI H,D16
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'LXI H,' + str.format('{:02X}', memory[regs['PC']+2]) \
-        + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['L'] = memory[regs['PC']+1]
     regs['H'] = memory[regs['PC']+2]
-    regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 10
 
 def instruction_22(): # SHLD Adr
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SHLD ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     i = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
     memory[i] = regs['L']
     memory[i+1] = regs['H']
-    regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 16
 
 def instruction_23(): # INX H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INX H')
-    hl = (256*regs['H'] + regs['L'] + 1)
+    global periods
+    hl = ((regs['H'] << 8 | regs['L']) + 1)
     if hl > 65535:
         hl = 0
         flags['K'] = 1
     else:
         flags['K'] = 0
-    regs['H'] = hl // 256
-    regs['L'] = hl % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['H'] = hl >> 8
+    regs['L'] = hl & 255
     periods += 5
 
 def instruction_24(): # INR H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INR H')
-    i = regs['H'] + 1
-    if i > 255:
-        i = 0
+    global periods
+    i = (regs['H'] + 1) & 255
     regs['H'] = i
     set_flags_ZSP(i)
-    if i & 15 == 0:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 0)
     periods += 5
 
 def instruction_25(): # DCR H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCR H')
-    i = regs['H'] - 1
-    if i < 0:
-        i = 255
+    global periods
+    i = (regs['H'] - 1) & 255
     regs['H'] = i
     set_flags_ZSP(i)
-    if i & 15 == 15:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 15)
     periods += 5
 
 def instruction_26(): # MVI H,D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'MVI H,' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['H'] = memory[regs['PC']+1]
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 7
 
 def instruction_27(): # DAA
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DAA')
-    ln = regs['A'] & 15
-    if ln > 9 or flags['AC'] == 1:
-        regs['A'] += 6
-    if ln > 9:
-        flags['AC'] = 1
-    hn = regs['A'] // 16
-    if hn > 9 or flags['CY'] == 1:
-        regs['A'] = (regs['A'] + 96) % 256
-    if hn > 9:
-        flags['CY'] = 1
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    regs['A'], flags['CY'], flags['AC'] = \
+        DAA_TABLE[(flags['AC'] << 9) | (flags['CY'] << 8) | regs['A']]
     periods += 4
 
-def instruction_28(): # undefined
-    print ('Undefined instuction 28 encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_29(): # DAD H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DAD H')
-    i = 2*(256*regs['H'] + regs['L'])
-    flags['CY'] = i // 2**16
+    global periods
+    i = 2*((regs['H'] << 8) | regs['L'])
+    flags['CY'] = i >> 16
     i = i & 65535
-    regs['H'] = i // 256
-    regs['L'] = i % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['H'] = i >> 8
+    regs['L'] = i & 255
     periods += 10
 
 def instruction_2A(): # LHLD Adr
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'LHLD ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     i = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
     regs['L'] = memory[i]
     regs['H'] = memory[i+1]
-    regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 16
 
 def instruction_2B(): # DCX H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCX H')
-    hl = (256*regs['H'] + regs['L'] - 1)
+    global periods
+    hl = ((regs['H'] << 8 | regs['L']) - 1)
     if hl < 0:
         hl = 65535
         flags['K'] = 1
     else:
         flags['K'] = 0
-    regs['H'] = hl // 256
-    regs['L'] = hl % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['H'] = hl >> 8
+    regs['L'] = hl & 255
     periods += 5
 
 def instruction_2C(): # INR L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INR L')
-    i = regs['L'] + 1
-    if i > 255:
-        i = 0
+    global periods
+    i = (regs['L'] + 1) & 255
     regs['L'] = i
     set_flags_ZSP(i)
-    if i & 15 == 0:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 0)
     periods += 5
 
 def instruction_2D(): # DCR L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCR L')
-    i = regs['L'] - 1
-    if i < 0:
-        i = 255
+    global periods
+    i = (regs['L'] - 1) & 255
     regs['L'] = i
     set_flags_ZSP(i)
-    if i & 15 == 15:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 15)
     periods += 5
 
 def instruction_2E(): # MVI L,D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'MVI L,' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['L'] = memory[regs['PC']+1]
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 7
 
 def instruction_2F(): # CMA
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMA')
+    global periods
     regs['A'] = (~ regs['A']) & 255
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 4
 
-def instruction_30(): # undefined
-    print ('Undefined instuction 30 encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 
 def instruction_31(): # LXI SP,D16
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'LXI SP,' + str.format('{:02X}', memory[regs['PC']+2]) \
-        + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['SP'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
-    regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 10
 
 def instruction_32(): # STA Adr
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'STA ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     a = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
     memory[a] = regs['A']
-    regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 13
 
 def instruction_33(): # INX SP
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INX SP')
+    global periods
     sp = (regs['SP'] + 1)
     if sp > 65535:
         sp = 0
@@ -622,84 +545,54 @@ def instruction_33(): # INX SP
     else:
         flags['K'] = 0
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
 def instruction_34(): # INR M
-    global memory, periods, regs, flags
+    global periods
 
-    if single_step: print(str.format('{:04X}', regs['PC']),'INR M')
-    i = memory[256*regs['H'] + regs['L']] + 1
-    if i > 255:
-        i = 0
-    memory[256*regs['H'] + regs['L']] = i
+    adr = (regs['H'] << 8) | regs['L']
+    i = (memory[adr] + 1) & 255
+    memory[adr] = i
     set_flags_ZSP(i)
-    if i & 15 == 0:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 0)
     periods += 10
 
 def instruction_35(): # DCR M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCR M')
-    i = memory[256*regs['H'] + regs['L']] - 1
-    if i < 0:
-        i = 255
-    memory[256*regs['H'] + regs['L']] = i
+    global periods
+    adr = (regs['H'] << 8) | regs['L']
+    i = (memory[adr] - 1) & 255
+    memory[adr] = i
     set_flags_ZSP(i)
-    if i & 15 == 15:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 15)
     periods += 10
 
 def instruction_36(): # MVI M,D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'MVI M,' + str.format('{:02X}', memory[regs['PC']+1]))
-    memory[256*regs['H'] + regs['L']] = memory[regs['PC']+1]
-    regs['PC'] = (regs['PC'] + 2) & 65535
+    global periods
+    memory[(regs['H'] << 8) | regs['L']] = memory[regs['PC']+1]
     periods += 10
 
 def instruction_37(): # STC
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'STC')
+    global periods
     flags['CY'] = 1
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 4
 
-def instruction_38(): # undefined
-    print ('Undefined instuction 38 encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_39(): # DAD SP
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DAD SP')
-    i = 256*regs['H'] + regs['L'] + regs['SP']
-    flags['CY'] = i // 2**16
+    global periods
+    i = (regs['H'] << 8 | regs['L']) + regs['SP']
+    flags['CY'] = i >> 16
     i = i & 65535
-    regs['H'] = i // 256
-    regs['L'] = i % 256
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    regs['H'] = i >> 8
+    regs['L'] = i & 255
     periods += 10
 
 def instruction_3A(): # LDA Adr
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'LDA ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     a = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
     regs['A'] = memory[a]
-    regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 13
 
 def instruction_3B(): # DCX SP
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCX SP')
+    global periods
     sp = (regs['SP'] - 1)
     if sp < 0:
         sp = 65535
@@ -707,1290 +600,62 @@ def instruction_3B(): # DCX SP
     else:
         flags['K'] = 0
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
 def instruction_3C(): # INR A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'INR A')
-    i = regs['A'] + 1
-    if i > 255:
-        i = 0
+    global periods
+    i = (regs['A'] + 1) & 255
     regs['A'] = i
     set_flags_ZSP(i)
-    if i & 15 == 0:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 0)
     periods += 5
 
 def instruction_3D(): # DCR A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'DCR A')
-    i = regs['A'] - 1
-    if i < 0:
-        i = 255
+    global periods
+    i = (regs['A'] - 1) & 255
     regs['A'] = i
     set_flags_ZSP(i)
-    if i & 15 == 15:
-        flags['AC'] = 1
-    else:
-        flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    flags['AC'] = int(i & 15 == 15)
     periods += 5
 
 def instruction_3E(): # MVI A,D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-        'MVI A,' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     regs['A'] = memory[regs['PC']+1]
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 7
 
 def instruction_3F(): # CMC
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMC')
+    global periods
     if (flags['CY'] == 0):
         flags['CY'] = 1
     else:
         flags['CY'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 4
 
-def instruction_40(): # MOV B,B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV B,B')
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_41(): # MOV B,C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV B,C')
-    regs['B'] = regs['C']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_42(): # MOV B,D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV B,D')
-    regs['B'] = regs['D']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_43(): # MOV B,E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV B,E')
-    regs['B'] = regs['E']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_44(): # MOV B,H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV B,H')
-    regs['B'] = regs['H']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_45(): # MOV B,L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV B,L')
-    regs['B'] = regs['L']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_46(): # MOV B,M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV B,M')
-    regs['B'] = memory[256*regs['H'] + regs['L']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_47(): # MOV B,A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV B,A')
-    regs['B'] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_48(): # MOV C,B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV C,B')
-    regs['C'] = regs['B']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_49(): # MOV C,C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV C,C')
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_4A(): # MOV C,D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV C,D')
-    regs['C'] = regs['D']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_4B(): # MOV C,E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV C,E')
-    regs['C'] = regs['E']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_4C(): # MOV C,H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV C,H')
-    regs['C'] = regs['H']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_4D(): # MOV C,L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV C,L')
-    regs['C'] = regs['L']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_4E(): # MOV C,M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV C,M')
-    regs['C'] = memory[256*regs['H'] + regs['L']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_4F(): # MOV C,A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV C,A')
-    regs['C'] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_50(): # MOV D,B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV D,B')
-    regs['D'] = regs['B']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_51(): # MOV D,C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV D,C')
-    regs['D'] = regs['C']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_52(): # MOV D,D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV D,D')
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_53(): # MOV D,E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV D,E')
-    regs['D'] = regs['E']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_54(): # MOV D,H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV D,H')
-    regs['D'] = regs['H']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_55(): # MOV D,L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV D,L')
-    regs['D'] = regs['L']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_56(): # MOV D,M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV D,M')
-    regs['D'] = memory[256*regs['H'] + regs['L']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_57(): # MOV D,A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV D,A')
-    regs['D'] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_58(): # MOV E,B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV E,B')
-    regs['E'] = regs['B']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_59(): # MOV E,C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV E,C')
-    regs['E'] = regs['C']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_5A(): # MOV E,D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV E,D')
-    regs['E'] = regs['D']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_5B(): # MOV E,E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV E,E')
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_5C(): # MOV E,H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV E,H')
-    regs['E'] = regs['H']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_5D(): # MOV E,L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV E,L')
-    regs['E'] = regs['L']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_5E(): # MOV E,M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV E,M')
-    regs['E'] = memory[256*regs['H'] + regs['L']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_5F(): # MOV E,A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV E,A')
-    regs['E'] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_60(): # MOV H,B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV H,B')
-    regs['H'] = regs['B']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_61(): # MOV H,C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV H,C')
-    regs['H'] = regs['C']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_62(): # MOV H,D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV H,D')
-    regs['H'] = regs['D']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_63(): # MOV H,E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV H,E')
-    regs['H'] = regs['E']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_64(): # MOV H,H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV H,H')
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_65(): # MOV H,L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV H,L')
-    regs['H'] = regs['L']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_66(): # MOV H,M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV H,M')
-    regs['H'] = memory[256*regs['H'] + regs['L']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_67(): # MOV H,A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV H,A')
-    regs['H'] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_68(): # MOV L,B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV L,B')
-    regs['L'] = regs['B']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_69(): # MOV L,C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV L,C')
-    regs['L'] = regs['C']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_6A(): # MOV L,D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV L,D')
-    regs['L'] = regs['D']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_6B(): # MOV L,E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV L,E')
-    regs['L'] = regs['E']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_6C(): # MOV L,H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV L,H')
-    regs['L'] = regs['H']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_6D(): # MOV L,L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV L,L')
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_6E(): # MOV L,M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV L,M')
-    regs['L'] = memory[256*regs['H'] + regs['L']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_6F(): # MOV L,A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV L,A')
-    regs['L'] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_70(): # MOV M,B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV M,B')
-    memory[256*regs['H'] + regs['L']] = regs['B']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_71(): # MOV M,C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV M,C')
-    memory[256*regs['H'] + regs['L']] = regs['C']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_72(): # MOV M,D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV M,D')
-    memory[256*regs['H'] + regs['L']] = regs['D']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_73(): # MOV M,E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV M,E')
-    memory[256*regs['H'] + regs['L']] = regs['E']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_74(): # MOV M,H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV M,H')
-    memory[256*regs['H'] + regs['L']] = regs['H']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_75(): # MOV M,L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV M,L')
-    memory[256*regs['H'] + regs['L']] = regs['L']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
 def instruction_76(): # HLT
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'HLT')
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_77(): # MOV M,A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV M,A')
-    memory[256*regs['H'] + regs['L']] = regs['A']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_78(): # MOV A,B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV A,B')
-    regs['A'] = regs['B']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_79(): # MOV A,C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV A,C')
-    regs['A'] = regs['C']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_7A(): # MOV A,D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV A,D')
-    regs['A'] = regs['D']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_7B(): # MOV A,E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV A,E')
-    regs['A'] = regs['E']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_7C(): # MOV A,H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV A,H')
-    regs['A'] = regs['H']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_7D(): # MOV A,L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV A,L')
-    regs['A'] = regs['L']
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_7E(): # MOV A,M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV A,M')
-    regs['A'] = memory[256*regs['H'] + regs['L']]
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_7F(): # MOV A,A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'MOV A,A')
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 5
-
-def instruction_80(): # ADD B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADD B')
-    i = regs['A'] + regs['B']
-    j = (regs['A'] & 15) + (regs['B'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_81(): # ADD C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADD C')
-    i = regs['A'] + regs['C']
-    j = (regs['A'] & 15) + (regs['C'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_82(): # ADD D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADD D')
-    i = regs['A'] + regs['D']
-    j = (regs['A'] & 15) + (regs['D'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_83(): # ADD E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADD E')
-    i = regs['A'] + regs['E']
-    j = (regs['A'] & 15) + (regs['E'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_84(): # ADD H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADD H')
-    i = regs['A'] + regs['H']
-    j = (regs['A'] & 15) + (regs['H'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_85(): # ADD L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADD L')
-    i = regs['A'] + regs['L']
-    j = (regs['A'] & 15) + (regs['L'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_86(): # ADD M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADD M')
-    i = regs['A'] + memory[256*regs['H'] + regs['L']]
-    j = (regs['A'] & 15) + (memory[256*regs['H'] + regs['L']] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_87(): # ADD A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADD A')
-    i = regs['A'] + regs['A']
-    j = (regs['A'] & 15) + (regs['A'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_88(): # ADC B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADC B')
-    i = regs['A'] + regs['B'] + flags['CY']
-    j = (regs['A'] & 15) + (regs['B'] & 15) + flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_89(): # ADC C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADC C')
-    i = regs['A'] + regs['C'] + flags['CY']
-    j = (regs['A'] & 15) + (regs['C'] & 15) + flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_8A(): # ADC D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADC D')
-    i = regs['A'] + regs['D'] + flags['CY']
-    j = (regs['A'] & 15) + (regs['D'] & 15) + flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_8B(): # ADC E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADC E')
-    i = regs['A'] + regs['E'] + flags['CY']
-    j = (regs['A'] & 15) + (regs['E'] & 15) + flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_8C(): # ADC H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADC H')
-    i = regs['A'] + regs['H'] + flags['CY']
-    j = (regs['A'] & 15) + (regs['H'] & 15) + flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_8D(): # ADC L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADC L')
-    i = regs['A'] + regs['L'] + flags['CY']
-    j = (regs['A'] & 15) + (regs['L'] & 15) + flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_8E(): # ADC M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADC M')
-    i = regs['A'] + memory[256*regs['H'] + regs['L']] + flags['CY']
-    j = (regs['A'] & 15) + (memory[256*regs['H'] + regs['L']] & 15) + flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_8F(): # ADC A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'ADC A')
-    i = regs['A'] + regs['A'] + flags['CY']
-    j = (regs['A'] & 15) + (regs['A'] & 15) + flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_90(): # SUB B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SUB B')
-    i = regs['A'] - regs['B']
-    j = (regs['A'] & 15) - (regs['B'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_91(): # SUB C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SUB C')
-    i = regs['A'] - regs['C']
-    j = (regs['A'] & 15) - (regs['C'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_92(): # SUB D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SUB D')
-    i = regs['A'] - regs['D']
-    j = (regs['A'] & 15) - (regs['D'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_93(): # SUB E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SUB E')
-    i = regs['A'] - regs['E']
-    j = (regs['A'] & 15) - (regs['E'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_94(): # SUB H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SUB H')
-    i = regs['A'] - regs['H']
-    j = (regs['A'] & 15) - (regs['H'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_95(): # SUB L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SUB L')
-    i = regs['A'] - regs['L']
-    j = (regs['A'] & 15) - (regs['L'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_96(): # SUB M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SUB M')
-    i = regs['A'] - memory[256*regs['H'] + regs['L']]
-    j = (regs['A'] & 15) - (memory[256*regs['H'] + regs['L']] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_97(): # SUB A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SUB A')
-    i = regs['A'] - regs['A']
-    j = (regs['A'] & 15) - (regs['A'] & 15)
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_98(): # SBB B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SBB B')
-    i = regs['A'] - regs['B'] - flags['CY']
-    j = (regs['A'] & 15) - (regs['B'] & 15) - flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_99(): # SBB C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SBB C')
-    i = regs['A'] - regs['C'] - flags['CY']
-    j = (regs['A'] & 15) - (regs['C'] & 15) - flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_9A(): # SBB D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SBB D')
-    i = regs['A'] - regs['D'] - flags['CY']
-    j = (regs['A'] & 15) - (regs['D'] & 15) - flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_9B(): # SBB E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SBB E')
-    i = regs['A'] - regs['E'] - flags['CY']
-    j = (regs['A'] & 15) - (regs['E'] & 15) - flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_9C(): # SBB H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SBB H')
-    i = regs['A'] - regs['H'] - flags['CY']
-    j = (regs['A'] & 15) - (regs['H'] & 15) - flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_9D(): # SBB L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SBB L')
-    i = regs['A'] - regs['L'] - flags['CY']
-    j = (regs['A'] & 15) - (regs['L'] & 15) - flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_9E(): # SBB M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SBB M')
-    i = regs['A'] - memory[256*regs['H'] + regs['L']] - flags['CY']
-    j = (regs['A'] & 15) - (memory[256*regs['H'] + regs['L']] & 15) - flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_9F(): # SBB A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'SBB A')
-    i = regs['A'] - regs['A'] - flags['CY']
-    j = (regs['A'] & 15) - (regs['A'] & 15) - flags['CY']
-    regs['A'] = i & 255
-    set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A0(): # ANA B
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ANA B')
-    regs['A'] = regs['A'] & regs['B']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A1(): # ANA C
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ANA C')
-    regs['A'] = regs['A'] & regs['C']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A2(): # ANA D
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ANA D')
-    regs['A'] = regs['A'] & regs['D']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A3(): # ANA E
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ANA E')
-    regs['A'] = regs['A'] & regs['E']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A4(): # ANA H
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ANA H')
-    regs['A'] = regs['A'] & regs['H']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A5(): # ANA L
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ANA L')
-    regs['A'] = regs['A'] & regs['L']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A6(): # ANA M
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ANA M')
-    regs['A'] = regs['A'] & memory[256*regs['H'] + regs['L']]
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_A7(): # ANA A
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ANA A')
-    regs['A'] = regs['A'] & regs['A']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A8(): # XRA B
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XRA B')
-    regs['A'] = regs['A'] ^ regs['B']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_A9(): # XRA C
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XRA C')
-    regs['A'] = regs['A'] ^ regs['C']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_AA(): # XRA D
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XRA D')
-    regs['A'] = regs['A'] ^ regs['D']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_AB(): # XRA E
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XRA E')
-    regs['A'] = regs['A'] ^ regs['E']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_AC(): # XRA H
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XRA H')
-    regs['A'] = regs['A'] ^ regs['H']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_AD(): # XRA L
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XRA L')
-    regs['A'] = regs['A'] ^ regs['L']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_AE(): # XRA M
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XRA M')
-    regs['A'] = regs['A'] ^ memory[256*regs['H'] + regs['L']]
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
     periods += 7
 
-def instruction_AF(): # XRA A
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XRA A')
-    regs['A'] = regs['A'] ^ regs['A']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B0(): # ORA B
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ORA B')
-    regs['A'] = regs['A'] | regs['B']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B1(): # ORA C
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ORA C')
-    regs['A'] = regs['A'] | regs['C']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B2(): # ORA D
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ORA D')
-    regs['A'] = regs['A'] | regs['D']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B3(): # ORA E
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ORA E')
-    regs['A'] = regs['A'] | regs['E']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B4(): # ORA H
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ORA H')
-    regs['A'] = regs['A'] | regs['H']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B5(): # ORA L
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ORA L')
-    regs['A'] = regs['A'] | regs['L']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B6(): # ORA M
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ORA M')
-    regs['A'] = regs['A'] | memory[256*regs['H'] + regs['L']]
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_B7(): # ORA A
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'ORA A')
-    regs['A'] = regs['A'] | regs['A']
-    set_flags_ZSP(regs['A'])
-    flags ['CY'] = 0
-    flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B8(): # CMP B
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMP B')
-    i = regs['A'] - regs['B']
-    j = (regs['A'] & 15) - (regs['B'] & 15)
-    set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_B9(): # CMP C
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMP C')
-    i = regs['A'] - regs['C']
-    j = (regs['A'] & 15) - (regs['C'] & 15)
-    set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_BA(): # CMP D
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMP D')
-    i = regs['A'] - regs['D']
-    j = (regs['A'] & 15) - (regs['D'] & 15)
-    set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_BB(): # CMP E
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMP E')
-    i = regs['A'] - regs['E']
-    j = (regs['A'] & 15) - (regs['E'] & 15)
-    set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_BC(): # CMP H
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMP H')
-    i = regs['A'] - regs['H']
-    j = (regs['A'] & 15) - (regs['H'] & 15)
-    set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_BD(): # CMP L
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMP L')
-    i = regs['A'] - regs['L']
-    j = (regs['A'] & 15) - (regs['L'] & 15)
-    set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
-def instruction_BE(): # CMP M
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMP M')
-    i = regs['A'] - memory[256*regs['H'] + regs['L']]
-    j = (regs['A'] & 15) - (memory[256*regs['H'] + regs['L']] & 15)
-    set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 7
-
-def instruction_BF(): # CMP A
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),'CMP A')
-    i = regs['A'] - regs['A']
-    j = (regs['A'] & 15) - (regs['A'] & 15)
-    set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 1) & 65535
-    periods += 4
-
 def instruction_C0(): # RNZ
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RNZ')
+    global periods
     if flags['Z'] == 0:
-        sp = regs['SP']
-        pc = memory[sp]
-        sp += 1
-        pc += 256 * memory[sp]
-        sp += 1
-        regs['PC'] = pc
-        regs['SP'] = sp
+        regs['PC'] = pop16()
         periods += 11
     else:
         regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
 def instruction_C1(): # POP B
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'POP B')
+    global periods
     sp = regs['SP']
     regs['C'] = memory[sp]
     sp = (sp + 1) & 65535
     regs['B'] = memory[sp]
     sp = (sp + 1) & 65535
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 10
 
 def instruction_C2(): # JNZ addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JNZ ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['Z'] == 0:
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 10
@@ -1999,10 +664,7 @@ def instruction_C2(): # JNZ addr
     periods += 10
 
 def instruction_C3(): # JMP addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JMP ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     target = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
     if target == 0x23: # jump to SAVE hardware hook
         hook_save()
@@ -2010,17 +672,9 @@ def instruction_C3(): # JMP addr
     periods += 10
 
 def instruction_C4(): # CNZ addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'CNZ ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['Z'] == 0:
-        sp = regs['SP']
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) // 256
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) % 256
-        regs['SP'] = sp
+        push16((regs['PC'] + 3) & 65535)
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 18
     else:
@@ -2028,76 +682,53 @@ def instruction_C4(): # CNZ addr
     periods += 9
 
 def instruction_C5(): # PUSH B
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'PUSH B')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
     memory[sp] = regs['B']
     sp = (sp - 1) & 65535
     memory[sp] = regs['C']
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 11
 
 def instruction_C6(): # ADI D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'ADI ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]
     i = regs['A'] + D8
     j = (regs['A'] & 15) + (D8 & 15)
     regs['A'] = i & 255
     set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 2) & 65535
+    flags['CY'] = i >> 8
+    flags['AC'] = j >> 4
     periods += 7
 
 def instruction_C7(): # RST 0
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RST 0')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] % 256
+    memory[sp] = regs['PC'] & 255
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] // 256
+    memory[sp] = regs['PC'] >> 8
     regs['SP'] = sp
     regs['PC'] = 8
     periods += 11
 
 def instruction_C8(): # RZ
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RZ')
+    global periods
     if flags['Z'] == 1:
-        sp = regs['SP']
-        pc = memory[sp]
-        sp += 1
-        pc += 256 * memory[sp]
-        sp += 1
-        regs['PC'] = pc
-        regs['SP'] = sp
+        regs['PC'] = pop16()
         periods += 11
     else:
         regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
 def instruction_C9(): # RET
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RET')
-    sp = regs['SP']
-    pc = memory[sp]
-    sp = (sp + 1) & 65535
-    pc += 256 * memory[sp]
-    sp = (sp + 1) & 65535
-    regs['PC'] = pc
-    regs['SP'] = sp
+    global periods
+    regs['PC'] = pop16()
     periods += 10
 
 def instruction_CA(): # JZ addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JZ ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['Z'] == 1:
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 10
@@ -2105,23 +736,10 @@ def instruction_CA(): # JZ addr
         regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 10
 
-def instruction_CB(): # undefined
-    print ('Undefined instuction CB encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_CC(): # CZ addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'CZ ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['Z'] == 1:
-        sp = regs['SP']
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) // 256
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) % 256
-        regs['SP'] = sp
+        push16((regs['PC'] + 3) & 65535)
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 17
     else:
@@ -2129,141 +747,66 @@ def instruction_CC(): # CZ addr
     periods += 11
 
 def instruction_CD(): # CALL addr
-    global memory, periods, regs, flags, single_step, column
-    global fline, fname, fsize, fload
-    if single_step: print(str.format('{:04X}', regs['PC']),'CALL ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods, column
     target = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
 
     if target == 0x57: # CALL LIN hardware hook
-        line = input()
-        KBDBFR = 0xFD00
-        ptr = 0
-        for char in line:
-            memory[KBDBFR+ptr] = ord(char)
-            ptr += 1
-        memory[KBDBFR+ptr] = 13
+        hook_lin()
         flags['CY'] = 0
         column = 1
         regs['PC'] = regs['PC'] + 3
         return
-    
+
     if target == 0x23: # CALL FLOUT hardware hook
-        ptr = 256*regs['D'] + regs['E']
-        msg = ''
-        while memory[ptr] > 0: # Get mesage pointed to by DE
-            msg += chr(memory[ptr])
-            ptr +=1
-        if msg == '$SIZE ': # Begin LOAD?
-            fload = True
-        elif fload == True:
-            fname = msg
-            fload = False
-        elif msg[:-1] == ' LINE': # Get number of lines in file
-            try:
-                fp = open(fname, 'r')
-                fsize = len(fp.readlines())
-                fp.close()
-                fsize += 1  # Flash drive overstates the size by 1
-                fline = 0
-            except:
-                fsize = 0
-            size = str(fsize)
-            ptr = 0xfd00  # FDBFR
-            for char in size:
-                memory[ptr] = ord(char)
-                ptr += 1
-            memory[ptr] = 0
-        elif msg == '$READ ':  # Read next line of file?
-            try:
-                f = open(fname)
-                prog = f.readlines() # Read the text file
-                f.close()
-                line = prog[fline]
-                fline += 1
-                ptr = 0xfd03   # FDBFR memory address + 3
-                for char in line:
-                    if ord(char) == 0xA:  # line feed?
-                        if memory[ptr-1] != 0xD:
-                            memory[ptr] = 0xD    # if no CR, add it
-                            ptr += 1
-                    memory[ptr] = ord(char)
-                    ptr +=1
-                memory[0xfc3e] = ptr % 256
-                memory[0xfc3f] = ptr // 256
-            except:
-                print('File READ error')
-                # sys.exit()
-        
-    sp = regs['SP']
-    sp = (sp - 1) & 65535
-    memory[sp] = ((regs['PC']+3) & 65535) // 256
-    sp = (sp - 1) & 65535
-    memory[sp] = ((regs['PC']+3) & 65535) % 256
-    regs['SP'] = sp
+        hook_flout((regs['D'] << 8) | regs['E'])
+
+    push16((regs['PC'] + 3) & 65535)
     regs['PC'] = target
     periods += 17
 
 def instruction_CE(): # ACI D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'ACI ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1] + flags['CY']
     i = regs['A'] + D8
     j = (regs['A'] & 15) + (D8 & 15)
     regs['A'] = i & 255
     set_flags_ZSP(regs['A'])
-    flags['CY'] = i // 256
-    flags['AC'] = j // 16
-    regs['PC'] = (regs['PC'] + 2) & 65535
+    flags['CY'] = i >> 8
+    flags['AC'] = j >> 4
     periods += 7
 
 def instruction_CF(): # RST 1
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RST 1')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] % 256
+    memory[sp] = regs['PC'] & 255
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] // 256
+    memory[sp] = regs['PC'] >> 8
     regs['SP'] = sp
     regs['PC'] = 16
     periods += 11
 
 def instruction_D0(): # RNC
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RNC')
+    global periods
     if flags['CY'] == 0:
-        sp = regs['SP']
-        pc = memory[sp]
-        sp += 1
-        pc += 256 * memory[sp]
-        sp += 1
-        regs['PC'] = pc
-        regs['SP'] = sp
+        regs['PC'] = pop16()
         periods += 11
     else:
         regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
 def instruction_D1(): # POP D
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'POP D')
+    global periods
     sp = regs['SP']
     regs['E'] = memory[sp]
     sp = (sp + 1) & 65535
     regs['D'] = memory[sp]
     sp = (sp + 1) & 65535
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 10
 
 def instruction_D2(): # JNC addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JNC ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['CY'] == 0:
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 10
@@ -2272,38 +815,17 @@ def instruction_D2(): # JNC addr
     periods += 10
 
 def instruction_D3(): # OUT D8
-    global memory, periods, regs, flags, column, save_flag, save_program, fname
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'OUT ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]
     port[D8] = regs['A']
-    if D8 == 2: # Hardware hook: port 2 mapped to UART data
-        if regs['A'] == 10: #ignore LF
-            pass
-        elif regs['A'] == 13: #handle CR
-            print('\n', end='')
-            column = 1
-        else:
-            print(chr(regs['A']), end = '', flush=True)
-            column += 1
-            if column > columns:
-                print('\n', end='')
-                column = 1
-    regs['PC'] = (regs['PC'] + 2) & 65535
+    if D8 in OUT_HOOKS:
+        OUT_HOOKS[D8](regs['A'])
     periods += 10
 
 def instruction_D4(): # CNC addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'CNC ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['CY'] == 0:
-        sp = regs['SP']
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) // 256
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) % 256
-        regs['SP'] = sp
+        push16((regs['PC'] + 3) & 65535)
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 17
     else:
@@ -2311,71 +833,48 @@ def instruction_D4(): # CNC addr
     periods += 11
 
 def instruction_D5(): # PUSH D
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'PUSH D')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
     memory[sp] = regs['D']
     sp = (sp - 1) & 65535
     memory[sp] = regs['E']
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 11
 
 def instruction_D6(): # SUI D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'SUI ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]    
     i = regs['A'] - D8
     j = (regs['A'] & 15) - (D8 & 15)
     regs['A'] = i & 255
     set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 2) & 65535
+    flags['CY'] = (i >> 8) & 1
+    flags['AC'] = (j >> 4) & 1
     periods += 7
 
 def instruction_D7(): # RST 2
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RST 2')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] % 256
+    memory[sp] = regs['PC'] & 255
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] // 256
+    memory[sp] = regs['PC'] >> 8
     regs['SP'] = sp
     regs['PC'] = 24
     periods += 11
 
 def instruction_D8(): # RC
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RC')
+    global periods
     if flags['CY'] == 1:
-        sp = regs['SP']
-        pc = memory[sp]
-        sp += 1
-        pc += 256 * memory[sp]
-        sp += 1
-        regs['PC'] = pc
-        regs['SP'] = sp
+        regs['PC'] = pop16()
         periods += 11
     else:
         regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
-def instruction_D9(): # undefined
-    print ('Undefined instuction D9 encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_DA(): # JC addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JC ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['CY'] == 1:
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 10
@@ -2384,101 +883,67 @@ def instruction_DA(): # JC addr
     periods += 10
 
 def instruction_DB(): # IN D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'IN ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]
-    if D8 == 3: # Hardware hook: port 3 mapped to UART status (1)
-        regs['A'] = 1
+    if D8 in IN_HOOKS:
+        regs['A'] = IN_HOOKS[D8]()
     else:
         regs['A'] = port[D8]
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 10
 
 def instruction_DC(): # CC addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'CC ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['CY'] == 1:
-        sp = regs['SP']
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) // 256
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) % 256
-        regs['SP'] = sp
+        push16((regs['PC'] + 3) & 65535)
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 17
     else:
         regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 11
 
-def instruction_DD(): # undefined
-    print ('Undefined instuction DD encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_DE(): # SBI D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'SBI ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]    
     i = regs['A'] - D8 - flags['CY']
     j = (regs['A'] & 15) - (D8 & 15) - flags['CY']
     regs['A'] = i & 255
     set_flags_ZSP(regs['A'])
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 2) & 65535
+    flags['CY'] = (i >> 8) & 1
+    flags['AC'] = (j >> 4) & 1
     periods += 7
 
 def instruction_DF(): # RST 3
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RST 3')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] % 256
+    memory[sp] = regs['PC'] & 255
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] // 256
+    memory[sp] = regs['PC'] >> 8
     regs['SP'] = sp
     regs['PC'] = 32
     periods += 11
 
 def instruction_E0(): # RPO
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RPO')
+    global periods
     if flags['P'] == 0:
-        sp = regs['SP']
-        pc = memory[sp]
-        sp += 1
-        pc += 256 * memory[sp]
-        sp += 1
-        regs['PC'] = pc
-        regs['SP'] = sp
+        regs['PC'] = pop16()
         periods += 11
     else:
         regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
 def instruction_E1(): # POP H
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'POP H')
+    global periods
     sp = regs['SP']
     regs['L'] = memory[sp]
     sp = (sp + 1) & 65535
     regs['H'] = memory[sp]
     sp = (sp + 1) & 65535
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 10
 
 def instruction_E2(): # JPO addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JPO ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['P'] == 0:
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 10
@@ -2487,29 +952,19 @@ def instruction_E2(): # JPO addr
     periods += 10
 
 def instruction_E3(): # XTHL
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XTHL')
+    global periods
     th = regs['H']
     tl = regs['L']
     regs['H'] = memory[regs['SP']+1]
     regs['L'] = memory[regs['SP']]
     memory[regs['SP']+1] = th
     memory[regs['SP']] = tl
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 18
 
 def instruction_E4(): # CPO addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'CPO ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['P'] == 0:
-        sp = regs['SP']
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) // 256
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) % 256
-        regs['SP'] = sp
+        push16((regs['PC'] + 3) & 65535)
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 17
     else:
@@ -2517,68 +972,51 @@ def instruction_E4(): # CPO addr
     periods += 11
 
 def instruction_E5(): # PUSH H
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'PUSH H')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
     memory[sp] = regs['H']
     sp = (sp - 1) & 65535
     memory[sp] = regs['L']
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 11
 
 def instruction_E6(): # ANI D8
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'ANI ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]    
     regs['A'] = regs['A'] & D8
     set_flags_ZSP(regs['A'])
     flags ['CY'] = 0
     flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 4
 
 def instruction_E7(): # RST 4
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RST 4')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] % 256
+    memory[sp] = regs['PC'] & 255
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] // 256
+    memory[sp] = regs['PC'] >> 8
     regs['SP'] = sp
     regs['PC'] = 40
     periods += 11
 
 def instruction_E8(): # RPE
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RPE')
+    global periods
     if flags['P'] == 1:
-        sp = regs['SP']
-        pc = memory[sp]
-        sp += 1
-        pc += 256 * memory[sp]
-        sp += 1
-        regs['PC'] = pc
-        regs['SP'] = sp
+        regs['PC'] = pop16()
         periods += 11
     else:
         regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
 def instruction_E9(): # PCHL
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'PCHL')
+    global periods
     regs['PC'] = 256* regs['H'] + regs['L']
     periods += 5
 
 def instruction_EA(): # JPE addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JPO ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['P'] == 1:
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 10
@@ -2587,104 +1025,67 @@ def instruction_EA(): # JPE addr
     periods += 10
 
 def instruction_EB(): # XCHG
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'XCHG')
+    global periods
     th = regs['H']
     tl = regs['L']
     regs['H'] = regs['D']
     regs['L'] = regs['E']
     regs['D'] = th
     regs['E'] = tl
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 4
 
 def instruction_EC(): # CPE addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'CPE ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['P'] == 1:
-        sp = regs['SP']
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) // 256
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) % 256
-        regs['SP'] = sp
+        push16((regs['PC'] + 3) & 65535)
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 17
     else:
         regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 11
 
-def instruction_ED(): # undefined
-    print ('Undefined instuction ED encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_EE(): # XRI D8
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'XRI ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]    
     regs['A'] = regs['A'] ^ D8
     set_flags_ZSP(regs['A'])
     flags ['CY'] = 0
     flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 4
 
 def instruction_EF(): # RST 5
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RST 5')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] % 256
+    memory[sp] = regs['PC'] & 255
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] // 256
+    memory[sp] = regs['PC'] >> 8
     regs['SP'] = sp
     regs['PC'] = 48
     periods += 11
 
 def instruction_F0(): # RP
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RP')
+    global periods
     if flags['S'] == 0:
-        sp = regs['SP']
-        pc = memory[sp]
-        sp += 1
-        pc += 256 * memory[sp]
-        sp += 1
-        regs['PC'] = pc
-        regs['SP'] = sp
+        regs['PC'] = pop16()
         periods += 12
     else:
         regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 6
 
 def instruction_F1(): # POP PSW
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'POP PSW')
+    global periods
     sp = regs['SP']
-    i = memory[sp]
-    flags['S'] = (i & 128) // 128
-    flags['Z'] = (i & 64) // 64
-    flags['K'] = (i & 32) // 32
-    flags['AC'] = (i & 16) // 16
-    flags['P'] = (i & 4) // 4
-    flags['V'] = (i & 2) // 2
-    flags['CY'] = (i & 1)
+    flags['S'], flags['Z'], flags['K'], flags['AC'], flags['P'], \
+        flags['V'], flags['CY'] = PSW_BITS[memory[sp]]
     sp = (sp + 1) & 65535
     regs['A'] = memory[sp]
     sp = (sp + 1) & 65535
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 10
 
 def instruction_F2(): # JP addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JP ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['S'] == 0:
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 10
@@ -2693,23 +1094,13 @@ def instruction_F2(): # JP addr
     periods += 7
 
 def instruction_F3(): # DI
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'DI')
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
     periods += 4
 
 def instruction_F4(): # CP addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'CP ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['S'] == 0:
-        sp = regs['SP']
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) // 256
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) % 256
-        regs['SP'] = sp
+        push16((regs['PC'] + 3) & 65535)
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 18
     else:
@@ -2717,77 +1108,52 @@ def instruction_F4(): # CP addr
     periods += 9
 
 def instruction_F5(): # PUSH PSW
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'PUSH PSW')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
     memory[sp] = regs['A']
     sp = (sp - 1) & 65535
-    i = 0
-    i += flags['S'] * 128
-    i += flags['Z'] * 64
-    i += flags['K'] * 32
-    i += flags['AC'] * 16
-    i += flags['P'] * 4
-    i += flags['V'] * 2
-    i += flags['CY']
-    memory[sp] = i
+    memory[sp] = pack_psw(flags['S'], flags['Z'], flags['K'], flags['AC'],
+                          flags['P'], flags['V'], flags['CY'])
     regs['SP'] = sp
-    regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 11
 
 def instruction_F6(): # ORI D8
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'ORI ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]    
     regs['A'] = regs['A'] | D8
     set_flags_ZSP(regs['A'])
     flags ['CY'] = 0
     flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 2) & 65535
     periods += 4
 
 def instruction_F7(): # RST 6
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RST 6')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] % 256
+    memory[sp] = regs['PC'] & 255
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] // 256
+    memory[sp] = regs['PC'] >> 8
     regs['SP'] = sp
     regs['PC'] = 56
     periods += 11
 
 def instruction_F8(): # RM
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RM')
+    global periods
     if flags['S'] == 1:
-        sp = regs['SP']
-        pc = memory[sp]
-        sp += 1
-        pc += 256 * memory[sp]
-        sp += 1
-        regs['PC'] = pc
-        regs['SP'] = sp
+        regs['PC'] = pop16()
         periods += 11
     else:
         regs['PC'] = (regs['PC'] + 1) & 65535
     periods += 5
 
 def instruction_F9(): # SPHL
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'SPHL')
-    regs['SP'] = 256*regs['H'] + regs['L']
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
+    regs['SP'] = (regs['H'] << 8) | regs['L']
     periods += 5
 
 def instruction_FA(): # JM addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'JM ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['S'] == 1:
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 10
@@ -2796,78 +1162,1772 @@ def instruction_FA(): # JM addr
     periods += 10
 
 def instruction_FB(): # EI
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'EI')
-    regs['PC'] = (regs['PC'] + 1) & 65535
+    global periods
     periods += 4
 
 def instruction_FC(): # CM addr
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'CM ' + \
-        str.format('{:02X}', memory[regs['PC']+2]) + \
-        str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     if flags['S'] == 1:
-        sp = regs['SP']
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) // 256
-        sp = (sp - 1) & 65535
-        memory[sp] = ((regs['PC']+3) & 65535) % 256
-        regs['SP'] = sp
+        push16((regs['PC'] + 3) & 65535)
         regs['PC'] = memory[regs['PC']+1] + 256*memory[regs['PC']+2]
         periods += 17
     else:
         regs['PC'] = (regs['PC'] + 3) & 65535
     periods += 11
 
-def instruction_FD(): # undefined
-    print ('Undefined instuction 0FD encountered at', str.format('{:04X}', regs['PC']))
-    global invalid
-    invalid = True
-
 def instruction_FE(): # CPI D8
-    global memory, periods, regs, flags
-    if single_step: print(str.format('{:04X}', regs['PC']),
-    'CPI ' + str.format('{:02X}', memory[regs['PC']+1]))
+    global periods
     D8 = memory[regs['PC']+1]    
     i = regs['A'] - D8
     j = (regs['A'] & 15) - (D8 & 15)
     set_flags_ZSP(i & 255)
-    if i < 0: flags['CY'] = 1
-    else: flags['CY'] = 0
-    if j < 0: flags['AC'] = 1
-    else: flags['AC'] = 0
-    regs['PC'] = (regs['PC'] + 2) & 65535
+    flags['CY'] = (i >> 8) & 1
+    flags['AC'] = (j >> 4) & 1
     periods += 7
 
 def instruction_FF(): # RST 7
-    global memory, periods, regs, flags, single_step
-    if single_step: print(str.format('{:04X}', regs['PC']),'RST 7')
+    global periods
     sp = regs['SP']
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] % 256
+    memory[sp] = regs['PC'] & 255
     sp = (sp - 1) & 65535
-    memory[sp] = regs['PC'] // 256
+    memory[sp] = regs['PC'] >> 8
     regs['SP'] = sp
     regs['PC'] = 64
     periods += 11
 
 
+def make_mov(dst, src): # Build a single-step MOV dst,src handler
+    if src == 'M':
+        def mov():
+            global periods
+            regs[dst] = memory[(regs['H'] << 8) | regs['L']]
+            periods += 7
+    elif dst == 'M':
+        def mov():
+            global periods
+            memory[(regs['H'] << 8) | regs['L']] = regs[src]
+            periods += 7
+    elif dst == src:
+        def mov():
+            global periods
+            periods += 5
+    else:
+        def mov():
+            global periods
+            regs[dst] = regs[src]
+            periods += 5
+    return mov
+
+# MOV opcodes 0x40-0x7F encode dst and src in two 3-bit fields (0x76 is HLT)
+MOV_REGS = ('B', 'C', 'D', 'E', 'H', 'L', 'M', 'A')
+for _op in range(0x40, 0x80):
+    if _op != 0x76:
+        globals()[f'instruction_{_op:02X}'] = \
+            make_mov(MOV_REGS[(_op >> 3) & 7], MOV_REGS[_op & 7])
+
+def make_alu(kind, src): # Build a single-step handler for the 0x80-0xBF group
+    if src == 'M':
+        fetch = lambda: memory[(regs['H'] << 8) | regs['L']]
+        cost = 7
+    else:
+        fetch = lambda: regs[src]
+        cost = 4
+    if src == 'A' and (kind == 'SUB' or kind == 'XRA'):
+        def alu(): # A op A always zeroes A and the carries
+            global periods
+            regs['A'] = 0
+            flags['Z'], flags['S'], flags['P'] = 1, 0, 1
+            flags['CY'] = 0
+            flags['AC'] = 0
+            periods += 4
+        return alu
+    if src == 'A' and kind == 'CMP':
+        def alu(): # A compares equal to itself, carries clear
+            global periods
+            flags['Z'], flags['S'], flags['P'] = 1, 0, 1
+            flags['CY'] = 0
+            flags['AC'] = 0
+            periods += 4
+        return alu
+    if src == 'A' and (kind == 'ANA' or kind == 'ORA'):
+        def alu(): # A op A leaves A alone and refreshes the flags
+            global periods
+            set_flags_ZSP(regs['A'])
+            flags['CY'] = 0
+            flags['AC'] = 0
+            periods += 4
+        return alu
+    if kind == 'ADD' or kind == 'ADC':
+        use_cy = int(kind == 'ADC')
+        def alu():
+            global periods
+            n = fetch()
+            carry = flags['CY'] * use_cy
+            i = regs['A'] + n + carry
+            j = (regs['A'] & 15) + (n & 15) + carry
+            regs['A'] = i & 255
+            set_flags_ZSP(regs['A'])
+            flags['CY'] = i >> 8
+            flags['AC'] = j >> 4
+            periods += cost
+    elif kind == 'SUB' or kind == 'SBB' or kind == 'CMP':
+        use_cy = int(kind == 'SBB')
+        store = kind != 'CMP'
+        def alu():
+            global periods
+            n = fetch()
+            borrow = flags['CY'] * use_cy
+            i = regs['A'] - n - borrow
+            j = (regs['A'] & 15) - (n & 15) - borrow
+            if store:
+                regs['A'] = i & 255
+            set_flags_ZSP(i & 255)
+            flags['CY'] = (i >> 8) & 1
+            flags['AC'] = (j >> 4) & 1
+            periods += cost
+    else: # ANA / XRA / ORA
+        if kind == 'ANA':
+            combine = lambda x, y: x & y
+        elif kind == 'XRA':
+            combine = lambda x, y: x ^ y
+        else:
+            combine = lambda x, y: x | y
+        def alu():
+            global periods
+            regs['A'] = combine(regs['A'], fetch())
+            set_flags_ZSP(regs['A'])
+            flags['CY'] = 0
+            flags['AC'] = 0
+            periods += cost
+    return alu
+
+# ALU opcodes 0x80-0xBF encode the operation and source in the same fields
+ALU_OPS = ('ADD', 'ADC', 'SUB', 'SBB', 'ANA', 'XRA', 'ORA', 'CMP')
+for _op in range(0x80, 0xC0):
+    globals()[f'instruction_{_op:02X}'] = \
+        make_alu(ALU_OPS[(_op >> 3) & 7], MOV_REGS[_op & 7])
+
+def make_undefined(code): # Shared handler for the unassigned opcodes
+    message = 'Undefined instuction ' + code + ' encountered at'
+    def undefined():
+        global invalid
+        print (message, f"{regs['PC']:04X}")
+        invalid = True
+    return undefined
+
+for _op in (0x08, 0x18, 0x20, 0x28, 0x30, 0x38, 0xCB, 0xD9, 0xDD, 0xED):
+    globals()[f'instruction_{_op:02X}'] = \
+        make_undefined(f'{_op:02X}')
+instruction_FD = make_undefined('0FD') # historical extra zero in this message
+
+# Single-step dispatch: bind all 256 opcode handlers once at load time.
+HANDLERS = tuple(globals()[f'instruction_{op:02X}'] for op in range(256))
+# Instruction length per opcode for the central PC increment in
+# execute_single(); 0 marks opcodes whose handler sets PC itself
+# (jumps, calls, returns, conditionals and the undefined codes).
+ILEN = bytes([
+    1, 3, 1, 1, 1, 1, 2, 1, 0, 1, 1, 1, 1, 1, 2, 1,
+    1, 3, 1, 1, 1, 1, 2, 1, 0, 1, 1, 1, 1, 1, 2, 1,
+    0, 3, 3, 1, 1, 1, 2, 1, 0, 1, 3, 1, 1, 1, 2, 1,
+    0, 3, 3, 1, 1, 1, 2, 1, 0, 1, 3, 1, 1, 1, 2, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    0, 1, 0, 0, 0, 1, 2, 0, 0, 0, 0, 0, 0, 0, 2, 0,
+    0, 1, 0, 2, 0, 1, 2, 0, 0, 0, 0, 2, 0, 0, 2, 0,
+    0, 1, 0, 1, 0, 1, 2, 0, 0, 0, 0, 1, 0, 0, 2, 0,
+    0, 1, 0, 1, 0, 1, 2, 0, 0, 1, 0, 1, 0, 0, 2, 0,
+])
+
+# Base clock periods per opcode, added once per loop pass in run().
+# Conditional branches add their taken-path extra in the handler;
+# CALL and the undefined opcodes are 0 and account for themselves.
+CYCLES = bytes([
+     4, 10,  7,  5,  5,  5,  7,  4,  0, 10,  7,  5,  5,  5,  7,  4,
+     7, 10,  7,  5,  5,  5,  7,  4,  0, 10,  7,  5,  5,  5,  7,  4,
+     0, 10, 16,  5,  5,  5,  7,  4,  0, 10, 16,  5,  5,  5,  7,  4,
+     0, 10, 13,  5, 10, 10, 10,  4,  0, 10, 13,  5,  5,  5,  7,  4,
+     5,  5,  5,  5,  5,  5,  7,  5,  5,  5,  5,  5,  5,  5,  7,  5,
+     5,  5,  5,  5,  5,  5,  7,  5,  5,  5,  5,  5,  5,  5,  7,  5,
+     5,  5,  5,  5,  5,  5,  7,  5,  5,  5,  5,  5,  5,  5,  7,  5,
+     7,  7,  7,  7,  7,  7,  7,  7,  5,  5,  5,  5,  5,  5,  7,  5,
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,
+     5, 10, 10, 10,  9, 11,  7, 11,  5, 10, 10,  0, 11,  0,  7, 11,
+     5, 10, 10, 10, 11, 11,  7, 11,  5,  0, 10, 10, 11,  0,  7, 11,
+     5, 10, 10, 18, 11, 11,  4, 11,  5,  5, 10,  4, 11,  0,  4, 11,
+     6, 10,  7,  4,  9, 11,  4, 11,  5,  5, 10,  4, 11,  0,  7, 11,
+])
+
+def run():
+    """Fetch/decode/execute loop: runs from the current PC until a
+    breakpoint, HLT or invalid instruction is reached.  Dispatches
+    inline so each 8080 instruction costs one pass through the loop
+    instead of a global lookup plus a Python function call."""
+    global periods, invalid, column
+    mem = memory
+    a = regs['A']; b = regs['B']; c = regs['C']; d = regs['D']
+    e = regs['E']; h = regs['H']; l = regs['L']
+    pc = regs['PC']; sp = regs['SP']
+    cy = flags['CY']; z = flags['Z']; s = flags['S']; p = flags['P']
+    ac = flags['AC']; k = flags['K']; v = flags['V']
+    t = periods
+    while pc != breakpoint and invalid == False:
+        if pc > 65535:
+            print('Error - invalid PC')
+            break
+        op = mem[pc]
+        t += CYCLES[op]
+        if op < 0x10:
+            if op == 0x00: # NOP
+                pc = (pc + 1) & 65535
+            elif op == 0x01: # LXI B,D16
+                c = mem[pc+1]
+                b = mem[pc+2]
+                pc = (pc + 3) & 65535
+            elif op == 0x02: # STAX B
+                mem[(b << 8) | c] = a
+                pc = (pc + 1) & 65535
+            elif op == 0x03: # INX B
+                c = (c + 1) & 255
+                if c == 0:
+                    b = (b + 1) & 255
+                    k = int(b == 0)
+                else:
+                    k = 0
+                pc = (pc + 1) & 65535
+            elif op == 0x04: # INR B
+                i = (b + 1) & 255
+                b = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x05: # DCR B
+                i = (b - 1) & 255
+                b = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 15)
+                npc = (pc + 1) & 65535
+                if mem[npc] == 0xC2 and npc != breakpoint: # fuse DCR+JNZ
+                    if z == 0:
+                        pc = mem[npc+1] + 256*mem[npc+2]
+                        t += 20
+                    else:
+                        pc = (npc + 3) & 65535
+                        t += 10
+                else:
+                    pc = npc
+            elif op == 0x06: # MVI B,D8
+                b = mem[pc+1]
+                pc = (pc + 2) & 65535
+            elif op == 0x07: # RLC
+                a, cy = ROT_RLC[a]
+                pc = (pc + 1) & 65535
+            elif op == 0x08: # undefined
+                print ('Undefined instuction 08 encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0x09: # DAD B
+                i = ((h << 8) | l) + ((b << 8) | c)
+                cy = i >> 16
+                h = (i >> 8) & 255
+                l = i & 255
+                pc = (pc + 1) & 65535
+            elif op == 0x0A: # LDAX B
+                a = mem[(b << 8) | c]
+                pc = (pc + 1) & 65535
+            elif op == 0x0B: # DCX B
+                if c == 0:
+                    c = 255
+                    b = (b - 1) & 255
+                    k = int(b == 255)
+                else:
+                    c = c - 1
+                    k = 0
+                pc = (pc + 1) & 65535
+            elif op == 0x0C: # INR C
+                i = (c + 1) & 255
+                c = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x0D: # DCR C
+                i = (c - 1) & 255
+                c = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 15)
+                npc = (pc + 1) & 65535
+                if mem[npc] == 0xC2 and npc != breakpoint: # fuse DCR+JNZ
+                    if z == 0:
+                        pc = mem[npc+1] + 256*mem[npc+2]
+                        t += 20
+                    else:
+                        pc = (npc + 3) & 65535
+                        t += 10
+                else:
+                    pc = npc
+            elif op == 0x0E: # MVI C,D8
+                c = mem[pc+1]
+                pc = (pc + 2) & 65535
+            else: # 0x0F RRC
+                a, cy = ROT_RRC[a]
+                pc = (pc + 1) & 65535
+        elif op < 0x20:
+            if op == 0x10: # ARHL (undocumented)
+                cy = l & 1
+                l = (l >> 1) + 128*(h & 1)
+                h = (h >> 1) + (h & 128)
+                pc = (pc + 1) & 65535
+            elif op == 0x11: # LXI D,D16
+                e = mem[pc+1]
+                d = mem[pc+2]
+                pc = (pc + 3) & 65535
+            elif op == 0x12: # STAX D
+                mem[(d << 8) | e] = a
+                pc = (pc + 1) & 65535
+            elif op == 0x13: # INX D
+                e = (e + 1) & 255
+                if e == 0:
+                    d = (d + 1) & 255
+                    k = int(d == 0)
+                else:
+                    k = 0
+                pc = (pc + 1) & 65535
+            elif op == 0x14: # INR D
+                i = (d + 1) & 255
+                d = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x15: # DCR D
+                i = (d - 1) & 255
+                d = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 15)
+                npc = (pc + 1) & 65535
+                if mem[npc] == 0xC2 and npc != breakpoint: # fuse DCR+JNZ
+                    if z == 0:
+                        pc = mem[npc+1] + 256*mem[npc+2]
+                        t += 20
+                    else:
+                        pc = (npc + 3) & 65535
+                        t += 10
+                else:
+                    pc = npc
+            elif op == 0x16: # MVI D,D8
+                d = mem[pc+1]
+                pc = (pc + 2) & 65535
+            elif op == 0x17: # RAL
+                a, cy = ROT_RAL[(cy << 8) | a]
+                pc = (pc + 1) & 65535
+            elif op == 0x18: # undefined
+                print ('Undefined instuction 18 encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0x19: # DAD D
+                i = ((h << 8) | l) + ((d << 8) | e)
+                cy = i >> 16
+                h = (i >> 8) & 255
+                l = i & 255
+                pc = (pc + 1) & 65535
+            elif op == 0x1A: # LDAX D
+                a = mem[(d << 8) | e]
+                pc = (pc + 1) & 65535
+            elif op == 0x1B: # DCX D
+                if e == 0:
+                    e = 255
+                    d = (d - 1) & 255
+                    k = int(d == 255)
+                else:
+                    e = e - 1
+                    k = 0
+                pc = (pc + 1) & 65535
+            elif op == 0x1C: # INR E
+                i = (e + 1) & 255
+                e = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x1D: # DCR E
+                i = (e - 1) & 255
+                e = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 15)
+                npc = (pc + 1) & 65535
+                if mem[npc] == 0xC2 and npc != breakpoint: # fuse DCR+JNZ
+                    if z == 0:
+                        pc = mem[npc+1] + 256*mem[npc+2]
+                        t += 20
+                    else:
+                        pc = (npc + 3) & 65535
+                        t += 10
+                else:
+                    pc = npc
+            elif op == 0x1E: # MVI E,D8
+                e = mem[pc+1]
+                pc = (pc + 2) & 65535
+            else: # 0x1F RAR
+                a, cy = ROT_RAR[(cy << 8) | a]
+                pc = (pc + 1) & 65535
+        elif op < 0x30:
+            if op == 0x20: # undefined
+                print ('Undefined instuction 20 encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0x21: # LXI H,D16
+                l = mem[pc+1]
+                h = mem[pc+2]
+                pc = (pc + 3) & 65535
+            elif op == 0x22: # SHLD Adr
+                i = mem[pc+1] + 256*mem[pc+2]
+                mem[i] = l
+                mem[i+1] = h
+                pc = (pc + 3) & 65535
+            elif op == 0x23: # INX H
+                l = (l + 1) & 255
+                if l == 0:
+                    h = (h + 1) & 255
+                    k = int(h == 0)
+                else:
+                    k = 0
+                pc = (pc + 1) & 65535
+            elif op == 0x24: # INR H
+                i = (h + 1) & 255
+                h = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x25: # DCR H
+                i = (h - 1) & 255
+                h = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 15)
+                pc = (pc + 1) & 65535
+            elif op == 0x26: # MVI H,D8
+                h = mem[pc+1]
+                pc = (pc + 2) & 65535
+            elif op == 0x27: # DAA
+                a, cy, ac = DAA_TABLE[(ac << 9) | (cy << 8) | a]
+                pc = (pc + 1) & 65535
+            elif op == 0x28: # undefined
+                print ('Undefined instuction 28 encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0x29: # DAD H
+                i = ((h << 8) | l) << 1
+                cy = i >> 16
+                h = (i >> 8) & 255
+                l = i & 255
+                pc = (pc + 1) & 65535
+            elif op == 0x2A: # LHLD Adr
+                i = mem[pc+1] + 256*mem[pc+2]
+                l = mem[i]
+                h = mem[i+1]
+                pc = (pc + 3) & 65535
+            elif op == 0x2B: # DCX H
+                if l == 0:
+                    l = 255
+                    h = (h - 1) & 255
+                    k = int(h == 255)
+                else:
+                    l = l - 1
+                    k = 0
+                pc = (pc + 1) & 65535
+            elif op == 0x2C: # INR L
+                i = (l + 1) & 255
+                l = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x2D: # DCR L
+                i = (l - 1) & 255
+                l = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 15)
+                pc = (pc + 1) & 65535
+            elif op == 0x2E: # MVI L,D8
+                l = mem[pc+1]
+                pc = (pc + 2) & 65535
+            else: # 0x2F CMA
+                a = (~ a) & 255
+                pc = (pc + 1) & 65535
+        elif op < 0x40:
+            if op == 0x30: # undefined
+                print ('Undefined instuction 30 encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0x31: # LXI SP,D16
+                sp = mem[pc+1] + 256*mem[pc+2]
+                pc = (pc + 3) & 65535
+            elif op == 0x32: # STA Adr
+                adr = mem[pc+1] + 256*mem[pc+2]
+                mem[adr] = a
+                pc = (pc + 3) & 65535
+            elif op == 0x33: # INX SP
+                sp = (sp + 1) & 65535
+                k = int(sp == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x34: # INR M
+                i = (mem[256*h + l] + 1) & 255
+                mem[256*h + l] = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x35: # DCR M
+                i = (mem[256*h + l] - 1) & 255
+                mem[256*h + l] = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 15)
+                pc = (pc + 1) & 65535
+            elif op == 0x36: # MVI M,D8
+                mem[256*h + l] = mem[pc+1]
+                pc = (pc + 2) & 65535
+            elif op == 0x37: # STC
+                cy = 1
+                pc = (pc + 1) & 65535
+            elif op == 0x38: # undefined
+                print ('Undefined instuction 38 encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0x39: # DAD SP
+                i = ((h << 8) | l) + sp
+                cy = i >> 16
+                h = (i >> 8) & 255
+                l = i & 255
+                pc = (pc + 1) & 65535
+            elif op == 0x3A: # LDA Adr
+                adr = mem[pc+1] + 256*mem[pc+2]
+                a = mem[adr]
+                pc = (pc + 3) & 65535
+            elif op == 0x3B: # DCX SP
+                sp = (sp - 1) & 65535
+                k = int(sp == 65535)
+                pc = (pc + 1) & 65535
+            elif op == 0x3C: # INR A
+                i = (a + 1) & 255
+                a = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 0)
+                pc = (pc + 1) & 65535
+            elif op == 0x3D: # DCR A
+                i = (a - 1) & 255
+                a = i
+                z, s, p = ZSP_TABLE[i]
+                ac = int(i & 15 == 15)
+                pc = (pc + 1) & 65535
+            elif op == 0x3E: # MVI A,D8
+                a = mem[pc+1]
+                pc = (pc + 2) & 65535
+            else: # 0x3F CMC
+                if (cy == 0):
+                    cy = 1
+                else:
+                    cy = 0
+                pc = (pc + 1) & 65535
+        elif op < 0x50:
+            if op == 0x40: # MOV B,B
+                pc = (pc + 1) & 65535
+            elif op == 0x41: # MOV B,C
+                b = c
+                pc = (pc + 1) & 65535
+            elif op == 0x42: # MOV B,D
+                b = d
+                pc = (pc + 1) & 65535
+            elif op == 0x43: # MOV B,E
+                b = e
+                pc = (pc + 1) & 65535
+            elif op == 0x44: # MOV B,H
+                b = h
+                pc = (pc + 1) & 65535
+            elif op == 0x45: # MOV B,L
+                b = l
+                pc = (pc + 1) & 65535
+            elif op == 0x46: # MOV B,M
+                b = mem[256*h + l]
+                pc = (pc + 1) & 65535
+            elif op == 0x47: # MOV B,A
+                b = a
+                pc = (pc + 1) & 65535
+            elif op == 0x48: # MOV C,B
+                c = b
+                pc = (pc + 1) & 65535
+            elif op == 0x49: # MOV C,C
+                pc = (pc + 1) & 65535
+            elif op == 0x4A: # MOV C,D
+                c = d
+                pc = (pc + 1) & 65535
+            elif op == 0x4B: # MOV C,E
+                c = e
+                pc = (pc + 1) & 65535
+            elif op == 0x4C: # MOV C,H
+                c = h
+                pc = (pc + 1) & 65535
+            elif op == 0x4D: # MOV C,L
+                c = l
+                pc = (pc + 1) & 65535
+            elif op == 0x4E: # MOV C,M
+                c = mem[256*h + l]
+                pc = (pc + 1) & 65535
+            else: # 0x4F MOV C,A
+                c = a
+                pc = (pc + 1) & 65535
+        elif op < 0x60:
+            if op == 0x50: # MOV D,B
+                d = b
+                pc = (pc + 1) & 65535
+            elif op == 0x51: # MOV D,C
+                d = c
+                pc = (pc + 1) & 65535
+            elif op == 0x52: # MOV D,D
+                pc = (pc + 1) & 65535
+            elif op == 0x53: # MOV D,E
+                d = e
+                pc = (pc + 1) & 65535
+            elif op == 0x54: # MOV D,H
+                d = h
+                pc = (pc + 1) & 65535
+            elif op == 0x55: # MOV D,L
+                d = l
+                pc = (pc + 1) & 65535
+            elif op == 0x56: # MOV D,M
+                d = mem[256*h + l]
+                pc = (pc + 1) & 65535
+            elif op == 0x57: # MOV D,A
+                d = a
+                pc = (pc + 1) & 65535
+            elif op == 0x58: # MOV E,B
+                e = b
+                pc = (pc + 1) & 65535
+            elif op == 0x59: # MOV E,C
+                e = c
+                pc = (pc + 1) & 65535
+            elif op == 0x5A: # MOV E,D
+                e = d
+                pc = (pc + 1) & 65535
+            elif op == 0x5B: # MOV E,E
+                pc = (pc + 1) & 65535
+            elif op == 0x5C: # MOV E,H
+                e = h
+                pc = (pc + 1) & 65535
+            elif op == 0x5D: # MOV E,L
+                e = l
+                pc = (pc + 1) & 65535
+            elif op == 0x5E: # MOV E,M
+                e = mem[256*h + l]
+                pc = (pc + 1) & 65535
+            else: # 0x5F MOV E,A
+                e = a
+                pc = (pc + 1) & 65535
+        elif op < 0x70:
+            if op == 0x60: # MOV H,B
+                h = b
+                pc = (pc + 1) & 65535
+            elif op == 0x61: # MOV H,C
+                h = c
+                pc = (pc + 1) & 65535
+            elif op == 0x62: # MOV H,D
+                h = d
+                pc = (pc + 1) & 65535
+            elif op == 0x63: # MOV H,E
+                h = e
+                pc = (pc + 1) & 65535
+            elif op == 0x64: # MOV H,H
+                pc = (pc + 1) & 65535
+            elif op == 0x65: # MOV H,L
+                h = l
+                pc = (pc + 1) & 65535
+            elif op == 0x66: # MOV H,M
+                h = mem[256*h + l]
+                pc = (pc + 1) & 65535
+            elif op == 0x67: # MOV H,A
+                h = a
+                pc = (pc + 1) & 65535
+            elif op == 0x68: # MOV L,B
+                l = b
+                pc = (pc + 1) & 65535
+            elif op == 0x69: # MOV L,C
+                l = c
+                pc = (pc + 1) & 65535
+            elif op == 0x6A: # MOV L,D
+                l = d
+                pc = (pc + 1) & 65535
+            elif op == 0x6B: # MOV L,E
+                l = e
+                pc = (pc + 1) & 65535
+            elif op == 0x6C: # MOV L,H
+                l = h
+                pc = (pc + 1) & 65535
+            elif op == 0x6D: # MOV L,L
+                pc = (pc + 1) & 65535
+            elif op == 0x6E: # MOV L,M
+                l = mem[256*h + l]
+                pc = (pc + 1) & 65535
+            else: # 0x6F MOV L,A
+                l = a
+                pc = (pc + 1) & 65535
+        elif op < 0x80:
+            if op == 0x70: # MOV M,B
+                mem[256*h + l] = b
+                pc = (pc + 1) & 65535
+            elif op == 0x71: # MOV M,C
+                mem[256*h + l] = c
+                pc = (pc + 1) & 65535
+            elif op == 0x72: # MOV M,D
+                mem[256*h + l] = d
+                pc = (pc + 1) & 65535
+            elif op == 0x73: # MOV M,E
+                mem[256*h + l] = e
+                pc = (pc + 1) & 65535
+            elif op == 0x74: # MOV M,H
+                mem[256*h + l] = h
+                pc = (pc + 1) & 65535
+            elif op == 0x75: # MOV M,L
+                mem[256*h + l] = l
+                pc = (pc + 1) & 65535
+            elif op == 0x76: # HLT
+                pc = (pc + 1) & 65535
+                break
+            elif op == 0x77: # MOV M,A
+                mem[256*h + l] = a
+                pc = (pc + 1) & 65535
+            elif op == 0x78: # MOV A,B
+                a = b
+                pc = (pc + 1) & 65535
+            elif op == 0x79: # MOV A,C
+                a = c
+                pc = (pc + 1) & 65535
+            elif op == 0x7A: # MOV A,D
+                a = d
+                pc = (pc + 1) & 65535
+            elif op == 0x7B: # MOV A,E
+                a = e
+                pc = (pc + 1) & 65535
+            elif op == 0x7C: # MOV A,H
+                a = h
+                pc = (pc + 1) & 65535
+            elif op == 0x7D: # MOV A,L
+                a = l
+                pc = (pc + 1) & 65535
+            elif op == 0x7E: # MOV A,M
+                a = mem[256*h + l]
+                pc = (pc + 1) & 65535
+            else: # 0x7F MOV A,A
+                pc = (pc + 1) & 65535
+        elif op < 0x90:
+            if op == 0x80: # ADD B
+                i = a + b
+                j = (a & 15) + (b & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x81: # ADD C
+                i = a + c
+                j = (a & 15) + (c & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x82: # ADD D
+                i = a + d
+                j = (a & 15) + (d & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x83: # ADD E
+                i = a + e
+                j = (a & 15) + (e & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x84: # ADD H
+                i = a + h
+                j = (a & 15) + (h & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x85: # ADD L
+                i = a + l
+                j = (a & 15) + (l & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x86: # ADD M
+                i = a + mem[256*h + l]
+                j = (a & 15) + (mem[256*h + l] & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x87: # ADD A
+                i = a + a
+                j = (a & 15) + (a & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x88: # ADC B
+                i = a + b + cy
+                j = (a & 15) + (b & 15) + cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x89: # ADC C
+                i = a + c + cy
+                j = (a & 15) + (c & 15) + cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x8A: # ADC D
+                i = a + d + cy
+                j = (a & 15) + (d & 15) + cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x8B: # ADC E
+                i = a + e + cy
+                j = (a & 15) + (e & 15) + cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x8C: # ADC H
+                i = a + h + cy
+                j = (a & 15) + (h & 15) + cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x8D: # ADC L
+                i = a + l + cy
+                j = (a & 15) + (l & 15) + cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            elif op == 0x8E: # ADC M
+                i = a + mem[256*h + l] + cy
+                j = (a & 15) + (mem[256*h + l] & 15) + cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+            else: # 0x8F ADC A
+                i = a + a + cy
+                j = (a & 15) + (a & 15) + cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 1) & 65535
+        elif op < 0xA0:
+            if op == 0x90: # SUB B
+                i = a - b
+                j = (a & 15) - (b & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x91: # SUB C
+                i = a - c
+                j = (a & 15) - (c & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x92: # SUB D
+                i = a - d
+                j = (a & 15) - (d & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x93: # SUB E
+                i = a - e
+                j = (a & 15) - (e & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x94: # SUB H
+                i = a - h
+                j = (a & 15) - (h & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x95: # SUB L
+                i = a - l
+                j = (a & 15) - (l & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x96: # SUB M
+                i = a - mem[256*h + l]
+                j = (a & 15) - (mem[256*h + l] & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x97: # SUB A: always zeroes A and the carries
+                a = 0
+                z, s, p = 1, 0, 1
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0x98: # SBB B
+                i = a - b - cy
+                j = (a & 15) - (b & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x99: # SBB C
+                i = a - c - cy
+                j = (a & 15) - (c & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x9A: # SBB D
+                i = a - d - cy
+                j = (a & 15) - (d & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x9B: # SBB E
+                i = a - e - cy
+                j = (a & 15) - (e & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x9C: # SBB H
+                i = a - h - cy
+                j = (a & 15) - (h & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x9D: # SBB L
+                i = a - l - cy
+                j = (a & 15) - (l & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0x9E: # SBB M
+                i = a - mem[256*h + l] - cy
+                j = (a & 15) - (mem[256*h + l] & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            else: # 0x9F SBB A
+                i = a - a - cy
+                j = (a & 15) - (a & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+        elif op < 0xB0:
+            if op == 0xA0: # ANA B
+                a = a & b
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA1: # ANA C
+                a = a & c
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA2: # ANA D
+                a = a & d
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA3: # ANA E
+                a = a & e
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA4: # ANA H
+                a = a & h
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA5: # ANA L
+                a = a & l
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA6: # ANA M
+                a = a & mem[256*h + l]
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA7: # ANA A: A unchanged, flags refreshed
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA8: # XRA B
+                a = a ^ b
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xA9: # XRA C
+                a = a ^ c
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xAA: # XRA D
+                a = a ^ d
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xAB: # XRA E
+                a = a ^ e
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xAC: # XRA H
+                a = a ^ h
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xAD: # XRA L
+                a = a ^ l
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xAE: # XRA M
+                a = a ^ mem[256*h + l]
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            else: # 0xAF XRA A: always zeroes A and the carries
+                a = 0
+                z, s, p = 1, 0, 1
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+        elif op < 0xC0:
+            if op == 0xB0: # ORA B
+                a = a | b
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xB1: # ORA C
+                a = a | c
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xB2: # ORA D
+                a = a | d
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xB3: # ORA E
+                a = a | e
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xB4: # ORA H
+                a = a | h
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xB5: # ORA L
+                a = a | l
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xB6: # ORA M
+                a = a | mem[256*h + l]
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xB7: # ORA A: A unchanged, flags refreshed
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+            elif op == 0xB8: # CMP B
+                i = a - b
+                j = (a & 15) - (b & 15)
+                z, s, p = ZSP_TABLE[i & 255]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0xB9: # CMP C
+                i = a - c
+                j = (a & 15) - (c & 15)
+                z, s, p = ZSP_TABLE[i & 255]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0xBA: # CMP D
+                i = a - d
+                j = (a & 15) - (d & 15)
+                z, s, p = ZSP_TABLE[i & 255]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0xBB: # CMP E
+                i = a - e
+                j = (a & 15) - (e & 15)
+                z, s, p = ZSP_TABLE[i & 255]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0xBC: # CMP H
+                i = a - h
+                j = (a & 15) - (h & 15)
+                z, s, p = ZSP_TABLE[i & 255]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0xBD: # CMP L
+                i = a - l
+                j = (a & 15) - (l & 15)
+                z, s, p = ZSP_TABLE[i & 255]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            elif op == 0xBE: # CMP M
+                i = a - mem[256*h + l]
+                j = (a & 15) - (mem[256*h + l] & 15)
+                z, s, p = ZSP_TABLE[i & 255]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 1) & 65535
+            else: # 0xBF CMP A: compares equal, carries clear
+                z, s, p = 1, 0, 1
+                cy = 0
+                ac = 0
+                pc = (pc + 1) & 65535
+        elif op < 0xD0:
+            if op == 0xC0: # RNZ
+                if z == 0:
+                    pc = mem[sp]
+                    sp += 1
+                    pc += 256 * mem[sp]
+                    sp += 1
+                    t += 11
+                else:
+                    pc = (pc + 1) & 65535
+            elif op == 0xC1: # POP B
+                c = mem[sp]
+                sp = (sp + 1) & 65535
+                b = mem[sp]
+                sp = (sp + 1) & 65535
+                pc = (pc + 1) & 65535
+            elif op == 0xC2: # JNZ addr
+                if z == 0:
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 10
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xC3: # JMP addr
+                target = mem[pc+1] + 256*mem[pc+2]
+                if target == 0x23: # jump to SAVE hardware hook
+                    regs['PC'] = pc # hook_save works on regs['PC']
+                    hook_save()
+                    pc = regs['PC']
+                pc = mem[pc+1] + 256*mem[pc+2]
+            elif op == 0xC4: # CNZ addr
+                if z == 0:
+                    ret = (pc + 3) & 65535
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret >> 8
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret & 255
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 18
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xC5: # PUSH B
+                sp = (sp - 1) & 65535
+                mem[sp] = b
+                sp = (sp - 1) & 65535
+                mem[sp] = c
+                pc = (pc + 1) & 65535
+            elif op == 0xC6: # ADI D8
+                D8 = mem[pc+1]
+                i = a + D8
+                j = (a & 15) + (D8 & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 2) & 65535
+            elif op == 0xC7: # RST 0
+                sp = (sp - 1) & 65535
+                mem[sp] = pc & 255
+                sp = (sp - 1) & 65535
+                mem[sp] = pc >> 8
+                pc = 8
+            elif op == 0xC8: # RZ
+                if z == 1:
+                    pc = mem[sp]
+                    sp += 1
+                    pc += 256 * mem[sp]
+                    sp += 1
+                    t += 11
+                else:
+                    pc = (pc + 1) & 65535
+            elif op == 0xC9: # RET
+                pc = mem[sp]
+                sp = (sp + 1) & 65535
+                pc += 256 * mem[sp]
+                sp = (sp + 1) & 65535
+            elif op == 0xCA: # JZ addr
+                if z == 1:
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 10
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xCB: # undefined
+                print ('Undefined instuction CB encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0xCC: # CZ addr
+                if z == 1:
+                    ret = (pc + 3) & 65535
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret >> 8
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret & 255
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 17
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xCD: # CALL addr
+                target = mem[pc+1] + 256*mem[pc+2]
+                if target == 0x57: # CALL LIN hardware hook
+                    hook_lin()
+                    cy = 0
+                    column = 1
+                    pc = pc + 3
+                    continue
+                if target == 0x23: # CALL FLOUT hardware hook
+                    hook_flout((d << 8) | e)
+                ret = (pc + 3) & 65535
+                sp = (sp - 1) & 65535
+                mem[sp] = ret >> 8
+                sp = (sp - 1) & 65535
+                mem[sp] = ret & 255
+                pc = target
+                t += 17
+            elif op == 0xCE: # ACI D8
+                D8 = mem[pc+1] + cy
+                i = a + D8
+                j = (a & 15) + (D8 & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = i >> 8
+                ac = j >> 4
+                pc = (pc + 2) & 65535
+            else: # 0xCF RST 1
+                sp = (sp - 1) & 65535
+                mem[sp] = pc & 255
+                sp = (sp - 1) & 65535
+                mem[sp] = pc >> 8
+                pc = 16
+        elif op < 0xE0:
+            if op == 0xD0: # RNC
+                if cy == 0:
+                    pc = mem[sp]
+                    sp += 1
+                    pc += 256 * mem[sp]
+                    sp += 1
+                    t += 11
+                else:
+                    pc = (pc + 1) & 65535
+            elif op == 0xD1: # POP D
+                e = mem[sp]
+                sp = (sp + 1) & 65535
+                d = mem[sp]
+                sp = (sp + 1) & 65535
+                pc = (pc + 1) & 65535
+            elif op == 0xD2: # JNC addr
+                if cy == 0:
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 10
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xD3: # OUT D8
+                D8 = mem[pc+1]
+                port[D8] = a
+                if D8 in OUT_HOOKS:
+                    OUT_HOOKS[D8](a)
+                pc = (pc + 2) & 65535
+            elif op == 0xD4: # CNC addr
+                if cy == 0:
+                    ret = (pc + 3) & 65535
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret >> 8
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret & 255
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 17
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xD5: # PUSH D
+                sp = (sp - 1) & 65535
+                mem[sp] = d
+                sp = (sp - 1) & 65535
+                mem[sp] = e
+                pc = (pc + 1) & 65535
+            elif op == 0xD6: # SUI D8
+                D8 = mem[pc+1]    
+                i = a - D8
+                j = (a & 15) - (D8 & 15)
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 2) & 65535
+            elif op == 0xD7: # RST 2
+                sp = (sp - 1) & 65535
+                mem[sp] = pc & 255
+                sp = (sp - 1) & 65535
+                mem[sp] = pc >> 8
+                pc = 24
+            elif op == 0xD8: # RC
+                if cy == 1:
+                    pc = mem[sp]
+                    sp += 1
+                    pc += 256 * mem[sp]
+                    sp += 1
+                    t += 11
+                else:
+                    pc = (pc + 1) & 65535
+            elif op == 0xD9: # undefined
+                print ('Undefined instuction D9 encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0xDA: # JC addr
+                if cy == 1:
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 10
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xDB: # IN D8
+                D8 = mem[pc+1]
+                if D8 in IN_HOOKS:
+                    a = IN_HOOKS[D8]()
+                else:
+                    a = port[D8]
+                pc = (pc + 2) & 65535
+            elif op == 0xDC: # CC addr
+                if cy == 1:
+                    ret = (pc + 3) & 65535
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret >> 8
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret & 255
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 17
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xDD: # undefined
+                print ('Undefined instuction DD encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0xDE: # SBI D8
+                D8 = mem[pc+1]    
+                i = a - D8 - cy
+                j = (a & 15) - (D8 & 15) - cy
+                a = i & 255
+                z, s, p = ZSP_TABLE[a]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 2) & 65535
+            else: # 0xDF RST 3
+                sp = (sp - 1) & 65535
+                mem[sp] = pc & 255
+                sp = (sp - 1) & 65535
+                mem[sp] = pc >> 8
+                pc = 32
+        elif op < 0xF0:
+            if op == 0xE0: # RPO
+                if p == 0:
+                    pc = mem[sp]
+                    sp += 1
+                    pc += 256 * mem[sp]
+                    sp += 1
+                    t += 11
+                else:
+                    pc = (pc + 1) & 65535
+            elif op == 0xE1: # POP H
+                l = mem[sp]
+                sp = (sp + 1) & 65535
+                h = mem[sp]
+                sp = (sp + 1) & 65535
+                pc = (pc + 1) & 65535
+            elif op == 0xE2: # JPO addr
+                if p == 0:
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 10
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xE3: # XTHL
+                th = h
+                tl = l
+                h = mem[sp+1]
+                l = mem[sp]
+                mem[sp+1] = th
+                mem[sp] = tl
+                pc = (pc + 1) & 65535
+            elif op == 0xE4: # CPO addr
+                if p == 0:
+                    ret = (pc + 3) & 65535
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret >> 8
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret & 255
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 17
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xE5: # PUSH H
+                sp = (sp - 1) & 65535
+                mem[sp] = h
+                sp = (sp - 1) & 65535
+                mem[sp] = l
+                pc = (pc + 1) & 65535
+            elif op == 0xE6: # ANI D8
+                D8 = mem[pc+1]    
+                a = a & D8
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 2) & 65535
+            elif op == 0xE7: # RST 4
+                sp = (sp - 1) & 65535
+                mem[sp] = pc & 255
+                sp = (sp - 1) & 65535
+                mem[sp] = pc >> 8
+                pc = 40
+            elif op == 0xE8: # RPE
+                if p == 1:
+                    pc = mem[sp]
+                    sp += 1
+                    pc += 256 * mem[sp]
+                    sp += 1
+                    t += 11
+                else:
+                    pc = (pc + 1) & 65535
+            elif op == 0xE9: # PCHL
+                pc = 256* h + l
+            elif op == 0xEA: # JPE addr
+                if p == 1:
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 10
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xEB: # XCHG
+                th = h
+                tl = l
+                h = d
+                l = e
+                d = th
+                e = tl
+                pc = (pc + 1) & 65535
+            elif op == 0xEC: # CPE addr
+                if p == 1:
+                    ret = (pc + 3) & 65535
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret >> 8
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret & 255
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 17
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xED: # undefined
+                print ('Undefined instuction ED encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0xEE: # XRI D8
+                D8 = mem[pc+1]    
+                a = a ^ D8
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 2) & 65535
+            else: # 0xEF RST 5
+                sp = (sp - 1) & 65535
+                mem[sp] = pc & 255
+                sp = (sp - 1) & 65535
+                mem[sp] = pc >> 8
+                pc = 48
+        else:
+            if op == 0xF0: # RP
+                if s == 0:
+                    pc = mem[sp]
+                    sp += 1
+                    pc += 256 * mem[sp]
+                    sp += 1
+                    t += 12
+                else:
+                    pc = (pc + 1) & 65535
+            elif op == 0xF1: # POP PSW
+                s, z, k, ac, p, v, cy = PSW_BITS[mem[sp]]
+                sp = (sp + 1) & 65535
+                a = mem[sp]
+                sp = (sp + 1) & 65535
+                pc = (pc + 1) & 65535
+            elif op == 0xF2: # JP addr
+                if s == 0:
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 10
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xF3: # DI
+                pc = (pc + 1) & 65535
+            elif op == 0xF4: # CP addr
+                if s == 0:
+                    ret = (pc + 3) & 65535
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret >> 8
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret & 255
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 18
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xF5: # PUSH PSW
+                sp = (sp - 1) & 65535
+                mem[sp] = a
+                sp = (sp - 1) & 65535
+                mem[sp] = (s << 7) | (z << 6) | (k << 5) | (ac << 4) \
+                    | (p << 2) | (v << 1) | cy
+                pc = (pc + 1) & 65535
+            elif op == 0xF6: # ORI D8
+                D8 = mem[pc+1]    
+                a = a | D8
+                z, s, p = ZSP_TABLE[a]
+                cy = 0
+                ac = 0
+                pc = (pc + 2) & 65535
+            elif op == 0xF7: # RST 6
+                sp = (sp - 1) & 65535
+                mem[sp] = pc & 255
+                sp = (sp - 1) & 65535
+                mem[sp] = pc >> 8
+                pc = 56
+            elif op == 0xF8: # RM
+                if s == 1:
+                    pc = mem[sp]
+                    sp += 1
+                    pc += 256 * mem[sp]
+                    sp += 1
+                    t += 11
+                else:
+                    pc = (pc + 1) & 65535
+            elif op == 0xF9: # SPHL
+                sp = 256*h + l
+                pc = (pc + 1) & 65535
+            elif op == 0xFA: # JM addr
+                if s == 1:
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 10
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xFB: # EI
+                pc = (pc + 1) & 65535
+            elif op == 0xFC: # CM addr
+                if s == 1:
+                    ret = (pc + 3) & 65535
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret >> 8
+                    sp = (sp - 1) & 65535
+                    mem[sp] = ret & 255
+                    pc = mem[pc+1] + 256*mem[pc+2]
+                    t += 17
+                else:
+                    pc = (pc + 3) & 65535
+            elif op == 0xFD: # undefined
+                print ('Undefined instuction 0FD encountered at', f'{pc:04X}')
+                invalid = True
+            elif op == 0xFE: # CPI D8
+                D8 = mem[pc+1]    
+                i = a - D8
+                j = (a & 15) - (D8 & 15)
+                z, s, p = ZSP_TABLE[i & 255]
+                cy = (i >> 8) & 1
+                ac = (j >> 4) & 1
+                pc = (pc + 2) & 65535
+            else: # 0xFF RST 7
+                sp = (sp - 1) & 65535
+                mem[sp] = pc & 255
+                sp = (sp - 1) & 65535
+                mem[sp] = pc >> 8
+                pc = 64
+
+    regs['A'] = a; regs['B'] = b; regs['C'] = c; regs['D'] = d
+    regs['E'] = e; regs['H'] = h; regs['L'] = l
+    regs['PC'] = pc; regs['SP'] = sp
+    flags['CY'] = cy; flags['Z'] = z; flags['S'] = s; flags['P'] = p
+    flags['AC'] = ac; flags['K'] = k; flags['V'] = v
+    periods = t
+
 #-----------------------------------------------------------------------------#
+# S command disassembly: opcode -> (mnemonic text, instruction length).
+# Undefined opcodes are absent; their handlers print their own message.
+DISASM = {
+    0x00: ('NOP', 1), 0x01: ('LXI B,', 3), 0x02: ('STAX B', 1),
+    0x03: ('INX B', 1), 0x04: ('INR B', 1), 0x05: ('DCR B', 1),
+    0x06: ('MVI B,', 2), 0x07: ('RLC', 1), 0x09: ('DAD B', 1),
+    0x0A: ('LDAX B', 1), 0x0B: ('DCX B', 1), 0x0C: ('INR C', 1),
+    0x0D: ('DCR C', 1), 0x0E: ('MVI C,', 2), 0x0F: ('RRC', 1),
+    0x10: ('ARHL', 1), 0x11: ('LXI D,', 3), 0x12: ('STAX D', 1),
+    0x13: ('INX D', 1), 0x14: ('INR D', 1), 0x15: ('DCR D', 1),
+    0x16: ('MVI D,', 2), 0x17: ('RAL', 1), 0x19: ('DAD D', 1),
+    0x1A: ('LDAX D', 1), 0x1B: ('DCX D', 1), 0x1C: ('INR E', 1),
+    0x1D: ('DCR E', 1), 0x1E: ('MVI E,', 2), 0x1F: ('RAR', 1),
+    0x21: ('LXI H,', 3), 0x22: ('SHLD ', 3), 0x23: ('INX H', 1),
+    0x24: ('INR H', 1), 0x25: ('DCR H', 1), 0x26: ('MVI H,', 2),
+    0x27: ('DAA', 1), 0x29: ('DAD H', 1), 0x2A: ('LHLD ', 3),
+    0x2B: ('DCX H', 1), 0x2C: ('INR L', 1), 0x2D: ('DCR L', 1),
+    0x2E: ('MVI L,', 2), 0x2F: ('CMA', 1), 0x31: ('LXI SP,', 3),
+    0x32: ('STA ', 3), 0x33: ('INX SP', 1), 0x34: ('INR M', 1),
+    0x35: ('DCR M', 1), 0x36: ('MVI M,', 2), 0x37: ('STC', 1),
+    0x39: ('DAD SP', 1), 0x3A: ('LDA ', 3), 0x3B: ('DCX SP', 1),
+    0x3C: ('INR A', 1), 0x3D: ('DCR A', 1), 0x3E: ('MVI A,', 2),
+    0x3F: ('CMC', 1), 0x40: ('MOV B,B', 1), 0x41: ('MOV B,C', 1),
+    0x42: ('MOV B,D', 1), 0x43: ('MOV B,E', 1), 0x44: ('MOV B,H', 1),
+    0x45: ('MOV B,L', 1), 0x46: ('MOV B,M', 1), 0x47: ('MOV B,A', 1),
+    0x48: ('MOV C,B', 1), 0x49: ('MOV C,C', 1), 0x4A: ('MOV C,D', 1),
+    0x4B: ('MOV C,E', 1), 0x4C: ('MOV C,H', 1), 0x4D: ('MOV C,L', 1),
+    0x4E: ('MOV C,M', 1), 0x4F: ('MOV C,A', 1), 0x50: ('MOV D,B', 1),
+    0x51: ('MOV D,C', 1), 0x52: ('MOV D,D', 1), 0x53: ('MOV D,E', 1),
+    0x54: ('MOV D,H', 1), 0x55: ('MOV D,L', 1), 0x56: ('MOV D,M', 1),
+    0x57: ('MOV D,A', 1), 0x58: ('MOV E,B', 1), 0x59: ('MOV E,C', 1),
+    0x5A: ('MOV E,D', 1), 0x5B: ('MOV E,E', 1), 0x5C: ('MOV E,H', 1),
+    0x5D: ('MOV E,L', 1), 0x5E: ('MOV E,M', 1), 0x5F: ('MOV E,A', 1),
+    0x60: ('MOV H,B', 1), 0x61: ('MOV H,C', 1), 0x62: ('MOV H,D', 1),
+    0x63: ('MOV H,E', 1), 0x64: ('MOV H,H', 1), 0x65: ('MOV H,L', 1),
+    0x66: ('MOV H,M', 1), 0x67: ('MOV H,A', 1), 0x68: ('MOV L,B', 1),
+    0x69: ('MOV L,C', 1), 0x6A: ('MOV L,D', 1), 0x6B: ('MOV L,E', 1),
+    0x6C: ('MOV L,H', 1), 0x6D: ('MOV L,L', 1), 0x6E: ('MOV L,M', 1),
+    0x6F: ('MOV L,A', 1), 0x70: ('MOV M,B', 1), 0x71: ('MOV M,C', 1),
+    0x72: ('MOV M,D', 1), 0x73: ('MOV M,E', 1), 0x74: ('MOV M,H', 1),
+    0x75: ('MOV M,L', 1), 0x76: ('HLT', 1), 0x77: ('MOV M,A', 1),
+    0x78: ('MOV A,B', 1), 0x79: ('MOV A,C', 1), 0x7A: ('MOV A,D', 1),
+    0x7B: ('MOV A,E', 1), 0x7C: ('MOV A,H', 1), 0x7D: ('MOV A,L', 1),
+    0x7E: ('MOV A,M', 1), 0x7F: ('MOV A,A', 1), 0x80: ('ADD B', 1),
+    0x81: ('ADD C', 1), 0x82: ('ADD D', 1), 0x83: ('ADD E', 1),
+    0x84: ('ADD H', 1), 0x85: ('ADD L', 1), 0x86: ('ADD M', 1),
+    0x87: ('ADD A', 1), 0x88: ('ADC B', 1), 0x89: ('ADC C', 1),
+    0x8A: ('ADC D', 1), 0x8B: ('ADC E', 1), 0x8C: ('ADC H', 1),
+    0x8D: ('ADC L', 1), 0x8E: ('ADC M', 1), 0x8F: ('ADC A', 1),
+    0x90: ('SUB B', 1), 0x91: ('SUB C', 1), 0x92: ('SUB D', 1),
+    0x93: ('SUB E', 1), 0x94: ('SUB H', 1), 0x95: ('SUB L', 1),
+    0x96: ('SUB M', 1), 0x97: ('SUB A', 1), 0x98: ('SBB B', 1),
+    0x99: ('SBB C', 1), 0x9A: ('SBB D', 1), 0x9B: ('SBB E', 1),
+    0x9C: ('SBB H', 1), 0x9D: ('SBB L', 1), 0x9E: ('SBB M', 1),
+    0x9F: ('SBB A', 1), 0xA0: ('ANA B', 1), 0xA1: ('ANA C', 1),
+    0xA2: ('ANA D', 1), 0xA3: ('ANA E', 1), 0xA4: ('ANA H', 1),
+    0xA5: ('ANA L', 1), 0xA6: ('ANA M', 1), 0xA7: ('ANA A', 1),
+    0xA8: ('XRA B', 1), 0xA9: ('XRA C', 1), 0xAA: ('XRA D', 1),
+    0xAB: ('XRA E', 1), 0xAC: ('XRA H', 1), 0xAD: ('XRA L', 1),
+    0xAE: ('XRA M', 1), 0xAF: ('XRA A', 1), 0xB0: ('ORA B', 1),
+    0xB1: ('ORA C', 1), 0xB2: ('ORA D', 1), 0xB3: ('ORA E', 1),
+    0xB4: ('ORA H', 1), 0xB5: ('ORA L', 1), 0xB6: ('ORA M', 1),
+    0xB7: ('ORA A', 1), 0xB8: ('CMP B', 1), 0xB9: ('CMP C', 1),
+    0xBA: ('CMP D', 1), 0xBB: ('CMP E', 1), 0xBC: ('CMP H', 1),
+    0xBD: ('CMP L', 1), 0xBE: ('CMP M', 1), 0xBF: ('CMP A', 1),
+    0xC0: ('RNZ', 1), 0xC1: ('POP B', 1), 0xC2: ('JNZ ', 3),
+    0xC3: ('JMP ', 3), 0xC4: ('CNZ ', 3), 0xC5: ('PUSH B', 1),
+    0xC6: ('ADI ', 2), 0xC7: ('RST 0', 1), 0xC8: ('RZ', 1),
+    0xC9: ('RET', 1), 0xCA: ('JZ ', 3), 0xCC: ('CZ ', 3),
+    0xCD: ('CALL ', 3), 0xCE: ('ACI ', 2), 0xCF: ('RST 1', 1),
+    0xD0: ('RNC', 1), 0xD1: ('POP D', 1), 0xD2: ('JNC ', 3),
+    0xD3: ('OUT ', 2), 0xD4: ('CNC ', 3), 0xD5: ('PUSH D', 1),
+    0xD6: ('SUI ', 2), 0xD7: ('RST 2', 1), 0xD8: ('RC', 1),
+    0xDA: ('JC ', 3), 0xDB: ('IN ', 2), 0xDC: ('CC ', 3),
+    0xDE: ('SBI ', 2), 0xDF: ('RST 3', 1), 0xE0: ('RPO', 1),
+    0xE1: ('POP H', 1), 0xE2: ('JPO ', 3), 0xE3: ('XTHL', 1),
+    0xE4: ('CPO ', 3), 0xE5: ('PUSH H', 1), 0xE6: ('ANI ', 2),
+    0xE7: ('RST 4', 1), 0xE8: ('RPE', 1), 0xE9: ('PCHL', 1),
+    0xEA: ('JPO ', 3), 0xEB: ('XCHG', 1), 0xEC: ('CPE ', 3),
+    0xEE: ('XRI ', 2), 0xEF: ('RST 5', 1), 0xF0: ('RP', 1),
+    0xF1: ('POP PSW', 1), 0xF2: ('JP ', 3), 0xF3: ('DI', 1),
+    0xF4: ('CP ', 3), 0xF5: ('PUSH PSW', 1), 0xF6: ('ORI ', 2),
+    0xF7: ('RST 6', 1), 0xF8: ('RM', 1), 0xF9: ('SPHL', 1),
+    0xFA: ('JM ', 3), 0xFB: ('EI', 1), 0xFC: ('CM ', 3),
+    0xFE: ('CPI ', 2), 0xFF: ('RST 7', 1),
+}
+
 def execute_program(list):
     """Execute program loaded into memory array"""
-    global periods, regs, memory, flags, invalid
+    global periods, invalid
     periods = 0
     if len(list) == 2:
         regs['PC'] = address(list[1])
-    while regs['PC'] != breakpoint and invalid == False:
-        #Read and execute next instruction pointed to by PC
-        if regs['PC'] > 2**16 - 1:
-            print('Error - invalid PC')
-            break
-        op_code = hex(memory[regs['PC']]).lstrip("0x").zfill(2).upper()
-        eval("instruction_" + op_code + "()")
-        if op_code == '76': # HLT?
-            break
+    run()
     if regs['PC'] == breakpoint:
         print('Break point reached')
     if invalid == True:
@@ -2876,16 +2936,24 @@ def execute_program(list):
 
 def execute_single(list):
     """"Execute single step of program"""
-    global single_step, regs, memory, flags
     if len(list) == 2:
         regs['PC'] = address(list[1])
-    if regs['PC'] > 2**16 - 1:
+    if regs['PC'] > 65535:
         print('Error - invalid PC')
         return
-    single_step = 1
-    op_code = hex(memory[regs['PC']]).lstrip("0x").zfill(2).upper()
-    eval("instruction_" + op_code + "()")
-    single_step = 0
+    pc = regs['PC']
+    op = memory[pc]
+    if op in DISASM:
+        text, length = DISASM[op]
+        if length == 3:
+            text += f'{memory[pc+2]:02X}{memory[pc+1]:02X}'
+        elif length == 2:
+            text += f'{memory[pc+1]:02X}'
+        print(f'{pc:04X} {text}')
+    HANDLERS[op]()
+    length = ILEN[op]
+    if length:
+        regs['PC'] = (regs['PC'] + length) & 65535
 
 def open_file(file_name, mode):
     """"Open a file."""
@@ -2901,13 +2969,11 @@ def command_list(command):
     """"Make a list with upper case command + optional parameters"""
     list = command.split()
     if len(list) == 0:
-        list.append('')
-    for i in range (len(list)):
-        if i==1 and list[0]== 'L': # Don't change case of LOAD parameter (file name)
-            pass
-        else:
-            list[i] = list[i].upper()
-    return list
+        return ['']
+    list[0] = list[0].upper()
+    if list[0] == 'L': # Don't change case of LOAD parameter (file name)
+        return list[:2] + [p.upper() for p in list[2:]]
+    return [list[0]] + [p.upper() for p in list[1:]]
 
 def address(str):
     """Convert string to int 16 bit address"""
@@ -2926,13 +2992,12 @@ def breakpoint_set(list):
     """Set the breakpoint address"""
     global breakpoint
     if len(list) == 1:
-        print(str.format('{:04X}', breakpoint))
+        print(f'{breakpoint:04X}')
     if len(list) == 2:
         breakpoint = address(list[1])
 
 def flag_set(list):
     """Set one of the flags"""
-    global flags
     try:
         flag = list[1]
         bit = int(list[2])
@@ -2943,13 +3008,12 @@ def flag_set(list):
 
 def display_memory(list):
     """Display the memory contents"""
-    global memory
     if len(list) == 1:
         return
     if len(list) == 2:
         m1 = address(list[1])
         if m1 != error:
-            print(str.format('{:04X}', m1), str.format('{:02X}', memory[m1]))
+            print(f'{m1:04X}', f'{memory[m1]:02X}')
     else:
         m1 = address(list[1])
         m2 = address(list[2])
@@ -2957,14 +3021,13 @@ def display_memory(list):
             if m1 > m2:
                 print('Invalid memory range')
                 return
-            for i in range(m1, m2+1):
-                if i == m1 or i%16 == 0:
-                    print(str.format('{:04X}', i)+': ', end='')
-                print(str.format('{:02X}', memory[i])+' ', end='')
-                if i%16 == 15:
-                    print()
-            if i%16 != 15:
-                print()
+            rows = []
+            i = m1
+            while i <= m2:
+                last = min(m2, i | 15) # row ends at a 16-byte boundary
+                rows.append(f'{i:04X}: ' + memory[i:last+1].hex(' ').upper() + ' ')
+                i = last + 1
+            print('\n'.join(rows))
 
 def memory_set(list):
     """Set memory value(s)"""
@@ -2973,19 +3036,21 @@ def memory_set(list):
         if addr < 0 or addr > 65535:
             print('Invalid address')
             return
-        for i in range(len(list)-2):
-            byte = int(list[i+2], 16)
+        data = bytearray()
+        for token in list[2:]:
+            byte = int(token, 16)
             if byte < 0 or byte > 255:
                 print('Invalid byte value')
                 return
-            memory[addr] = byte
-            addr += 1
+            data.append(byte)
+        if addr + len(data) > 65536:
+            raise IndexError # would run past top of memory
+        memory[addr:addr+len(data)] = data
     except:
         print('Value error')
 
 def port_set(list):
     """Display/Set port value"""
-    global ports
 #    if len(list) == 2:
 
         
@@ -3007,22 +3072,20 @@ def display_help():
 
 def rform(reg):
     """Format register content"""
-    global regs
-    return str.format('{:02X}', regs[reg])
+    return f'{regs[reg]:02X}'
     
 def display_registers(list):
     """Display or modify registers and display flags"""
-    global regs, flags
     if len(list) == 1:
         print("A  ", rform("A"),           "\t\tCY", flags["CY"])
         print("BC ", rform("B"), rform("C"), "\tV ", flags["V"])
         print("DE ", rform("D"), rform("E"), "\tP ", flags["P"])
         print("HL ", rform("H"), rform("L"), "\tAC", flags["AC"])
-        print("PC ", str.format('{:04X}', regs["PC"]), "\tK ", flags["K"])
-        print("SP ", str.format('{:04X}', regs["SP"]), "\tZ ", flags["Z"])
+        print("PC ", f'{regs["PC"]:04X}', "\tK ", flags["K"])
+        print("SP ", f'{regs["SP"]:04X}', "\tZ ", flags["Z"])
         flag_byte = flags["CY"] + 2*flags["V"] + 4*flags["P"] + 16*flags["AC"] \
             + 32*flags["K"] + 64*flags["Z"] + 128*flags["S"]
-        PSW = rform("A") + str.format('{:02X}', flag_byte)
+        PSW = rform("A") + f'{flag_byte:02X}'
         print("PSW", PSW, "\tS ", flags["S"])
     else:
         try:
@@ -3049,32 +3112,30 @@ def load_file(list):
     try:
         hexfile = open_file(file_name, 'r')
         while True:
-            str = hexfile.readline()
-            bytes = int(str[1:3], 16)
-            if bytes == 0:
+            line = hexfile.readline()
+            count = int(line[1:3], 16)
+            if count == 0:
                 break
-            address = int(str[3:7], 16)
-            for i in range(bytes):
-                byte = int(str[9+2*i:11+2*i], 16)
-                memory[address] = byte
-                address += 1
+            addr = int(line[3:7], 16)
+            if addr + count > 65536: # record runs past top of memory
+                memory[addr:] = bytes.fromhex(line[9:9+2*(65536-addr)])
+                raise IndexError
+            memory[addr:addr+count] = bytes.fromhex(line[9:9+2*count])
         hexfile.close()
     except:
         print('Invalid or missing file')
 
 def hook_save():
     """Hardware hook simulates save to flash drive"""
-    text = ""
     keyboard_buffer = 0xFE00
     basbeg = 0x8000
     basend_ptr = 0xFC00
     basend = memory[basend_ptr]+256*memory[basend_ptr+1]
-    for i in range (255):
-        text += chr(memory[keyboard_buffer+i])
+    text = bytes(memory[keyboard_buffer:keyboard_buffer+255])
     try:
-        pos1 = text.find('\x9C')+1     #pos of SAVE token+1
-        pos2 = text.find('\x00', pos1) #pos of end of line
-        file_name = text[pos1:pos2].lstrip()
+        pos1 = text.find(b'\x9C')+1     #pos of SAVE token+1
+        pos2 = text.find(b'\x00', pos1) #pos of end of line
+        file_name = text[pos1:pos2].lstrip().decode('latin-1')
         f = open(file_name, "w")
         f.write("this is a test\n")
         f.close()
@@ -3091,6 +3152,20 @@ def hook_save():
 # main
 #----------------------------------------------------------------------
 
+# Monitor commands that take the parsed command list; the few commands
+# with no argument or loop-local state are handled inline below.
+COMMANDS = {
+    "B": breakpoint_set,
+    "D": display_memory,
+    "E": execute_program,
+    "F": flag_set,
+    "L": load_file,
+    "M": memory_set,
+    "P": port_set,
+    "R": display_registers,
+    "S": execute_single,
+}
+
 print("\n--- Emulator for Intel 8080A microprocessor ---")
 if len(sys.argv) > 1: # handle optional argv for load file
     fname = sys.argv[1].strip()
@@ -3100,27 +3175,11 @@ while True:
     command_string = input("]")
     cl = command_list(command_string)
     command = cl[0]
-    if command == "B":
-        breakpoint_set(cl)
+    if command == "Q" or command == "QUIT":
+        break
     if command == "C":
         breakpoint = -1
-    if command == "D":
-        display_memory(cl)
-    if command == "E":
-        execute_program(cl)
-    if command == "F":
-        flag_set(cl)
-    if command == "H" or cl[0] == "HELP":
+    elif command == "H" or command == "HELP":
         display_help()
-    if command == "L":
-        load_file(cl)
-    if command == "M":
-        memory_set(cl)
-    if command == "P":
-        port_set(cl)
-    if command == "R":
-        display_registers(cl)
-    if command == "S":
-        execute_single(cl)
-    if command == "Q" or cl[0] == "QUIT":
-        break
+    elif command in COMMANDS:
+        COMMANDS[command](cl)